@@ -0,0 +1,135 @@
+"""Generate synthetic DRS directory trees for the ingestion benchmarks."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import toml
+
+FIXED_PARTS: Dict[str, Sequence[str]] = {
+    "time_frequency": ("mon", "day", "6hr", "3hr", "1hr"),
+    "realm": ("atmos", "ocean", "land", "seaIce"),
+    "cmor_table": ("Amon", "day", "6hrLev", "3hr", "E1hr"),
+    "variable": ("tas", "pr", "uas", "vas", "psl", "huss", "rlds", "rsds"),
+    "grid_label": ("gn", "gr", "gr1"),
+}
+"""Realistic values of some DRS components."""
+
+
+@dataclass
+class TreeShape:
+    """Shape of a synthetic DRS tree.
+
+    Parameters
+    ----------
+    num_files:
+        Total number of files of the tree.
+    files_per_dataset:
+        Number of time steps, i.e. files, of every dataset version.
+    versions:
+        Number of versions of every dataset.
+    fanout:
+        Number of different values of every DRS directory component.
+    """
+
+    num_files: int = 10_000
+    files_per_dataset: int = 20
+    versions: int = 2
+    fanout: int = 4
+
+
+def _component(part: str, num: int, fanout: int, defaults: Dict[str, str]) -> str:
+    if part in defaults and not any(char in defaults[part] for char in "*?"):
+        return defaults[part]
+    values = FIXED_PARTS.get(part)
+    if values:
+        return values[num % min(fanout, len(values))]
+    return f"{part.replace('_', '')}{num % fanout}"
+
+
+def iter_paths(
+    structure: Dict[str, Any], root_dir: Path, shape: TreeShape
+) -> Iterator[Path]:
+    """Create the paths of a tree following a DRS structure of the config."""
+    parts_dir: List[str] = structure["parts_dir"]
+    parts_file: List[str] = structure["parts_file_name"]
+    defaults: Dict[str, str] = structure.get("defaults", {})
+    per_dataset = max(shape.files_per_dataset, 1) * max(shape.versions, 1)
+    num_datasets = -(-shape.num_files // per_dataset)
+    count = 0
+    for dataset in range(num_datasets):
+        parts: Dict[str, str] = {}
+        digits = dataset
+        for part in parts_dir:
+            if part == "version":
+                continue
+            parts[part] = _component(part, digits, shape.fanout, defaults)
+            digits //= max(shape.fanout, 1)
+        # make the dataset unique even if fanout**len(parts_dir) is too small
+        parts["ensemble"] = f"r{dataset + 1}i1p1"
+        for version in range(max(shape.versions, 1)):
+            parts["version"] = f"v2020{version + 1:04d}"
+            directory = root_dir.joinpath(*(parts[p] for p in parts_dir))
+            for step in range(max(shape.files_per_dataset, 1)):
+                if count >= shape.num_files:
+                    return
+                year = 1850 + step
+                parts["time"] = f"{year}01-{year}12"
+                name = "_".join(parts.get(p, p) for p in parts_file)
+                yield directory / f"{name}.nc"
+                count += 1
+
+
+def make_tree(
+    drs_config: os.PathLike,
+    root: os.PathLike,
+    shape: TreeShape,
+    structures: Optional[Sequence[str]] = None,
+) -> Path:
+    """Create a synthetic tree of empty files for each DRS structure.
+
+    The files are distributed evenly between the structures, the tree of
+    each structure is created in ``<root>/data/<structure>``. A copy of the
+    DRS config whose root directories point to the generated trees is
+    written to the root directory.
+
+    Returns
+    -------
+    Path:
+        The path to the DRS config of the generated trees.
+    """
+    root = Path(root).absolute()
+    config = toml.loads(Path(drs_config).read_text())
+    names = [
+        name
+        for name, structure in config.items()
+        if "parts_dir" in structure and (not structures or name in structures)
+    ]
+    if not names:
+        raise ValueError(f"No DRS structures to generate in {drs_config}")
+    bench_config = {}
+    for num, name in enumerate(names):
+        structure = config[name]
+        tree_shape = TreeShape(
+            num_files=shape.num_files // len(names)
+            + (num < shape.num_files % len(names)),
+            files_per_dataset=shape.files_per_dataset,
+            versions=shape.versions if "version" in structure["parts_dir"] else 1,
+            fanout=shape.fanout,
+        )
+        root_dir = root / "data" / name
+        structure = {**structure, "root_dir": str(root_dir)}
+        structure.pop("root_path", None)
+        bench_config[name] = structure
+        created = set()
+        for path in iter_paths(structure, root_dir, tree_shape):
+            if path.parent not in created:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                created.add(path.parent)
+            path.touch()
+    config_file = root / "drs_config.toml"
+    config_file.write_text(toml.dumps(bench_config))
+    return config_file
@@ -0,0 +1,230 @@
+"""Benchmarks of the crawling and ingestion of data into solr.
+
+A synthetic DRS tree of empty files is generated from a DRS config and the
+stages of the ingestion are timed on it:
+
+- ``dir_iter``: walking the tree
+- ``from_path``: parsing the paths into :class:`DRSFile` objects
+- ``to_solr_dict``: creating the solr documents of the files
+- ``load_fs``: the full crawl and ingestion into a local solr stand-in
+
+Every benchmark runs in a fresh process and reports the processed files
+per second and the peak resident memory of the process.
+
+Usage::
+
+    python benchmarks/ingest.py --files 100000 --workers 4 --json results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from drs_tree import TreeShape, make_tree
+from solr_stub import SolrStub
+
+BENCHMARKS = ("dir_iter", "from_path", "to_solr_dict", "load_fs")
+"""The available benchmarks."""
+
+
+def _peak_rss() -> int:
+    """Peak resident memory in bytes of this process and its children."""
+    scale = 1 if sys.platform == "darwin" else 1024
+    return scale * max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+
+def bench_dir_iter(root: Path, **kwargs: Any) -> Dict[str, Any]:
+    from evaluation_system.model.solr_core import dir_iter
+
+    start = time.perf_counter()
+    files = sum(1 for _ in dir_iter(root))
+    return {"files": files, "seconds": time.perf_counter() - start}
+
+
+def bench_from_path(root: Path, **kwargs: Any) -> Dict[str, Any]:
+    from evaluation_system.model.file import DRSFile
+    from evaluation_system.model.solr_core import dir_iter
+
+    files = list(dir_iter(root))
+    start = time.perf_counter()
+    for file in files:
+        DRSFile.from_path(file)
+    return {"files": len(files), "seconds": time.perf_counter() - start}
+
+
+def bench_to_solr_dict(root: Path, **kwargs: Any) -> Dict[str, Any]:
+    from evaluation_system.model.file import DRSFile
+    from evaluation_system.model.solr_core import SolrCore, dir_iter
+
+    drs_files = [DRSFile.from_path(f) for f in dir_iter(root)]
+    start = time.perf_counter()
+    for drs_file in drs_files:
+        SolrCore.to_solr_dict(drs_file)
+    return {"files": len(drs_files), "seconds": time.perf_counter() - start}
+
+
+def bench_load_fs(
+    root: Path,
+    host: str = "127.0.0.1",
+    port: int = 8983,
+    workers: int = 1,
+    chunk_size: int = 10000,
+    compress: bool = False,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    from evaluation_system.model.solr_core import SolrCore
+
+    start = time.perf_counter()
+    summary = SolrCore.load_fs(
+        root,
+        host=host,
+        port=port,
+        workers=workers,
+        chunk_size=chunk_size,
+        compress=compress,
+        abort_on_errors=True,
+        checkpoint_interval=None,
+        progress_interval=None,
+    )
+    return {
+        "files": summary["files"],
+        "seconds": time.perf_counter() - start,
+        "summary": summary,
+    }
+
+
+def _run(name: str, drs_config: str, root: Path, kwargs: Dict[str, Any]) -> Dict:
+    """Run a benchmark, executed in a fresh process."""
+    os.environ["EVALUATION_SYSTEM_DRS_CONFIG_FILE"] = drs_config
+    from evaluation_system.misc import config, logger
+
+    logger.setLevel("ERROR")
+    config.reloadConfiguration()
+    func: Callable[..., Dict[str, Any]] = globals()[f"bench_{name}"]
+    # the benchmarks time themselves, excluding imports and their setup
+    result = func(root, **kwargs)
+    return {
+        "benchmark": name,
+        "files": result["files"],
+        "seconds": round(result["seconds"], 4),
+        "files_per_second": round(result["files"] / max(result["seconds"], 1e-9), 1),
+        "peak_rss_mib": round(_peak_rss() / 2**20, 1),
+        **{k: v for k, v in result.items() if k not in ("files", "seconds")},
+    }
+
+
+def run_benchmarks(
+    shape: TreeShape,
+    drs_config: os.PathLike,
+    benchmarks: List[str],
+    structures: Optional[List[str]] = None,
+    work_dir: Optional[os.PathLike] = None,
+    **kwargs: Any,
+) -> List[Dict[str, Any]]:
+    """Generate a tree and run the benchmarks on it."""
+    with tempfile.TemporaryDirectory(prefix="freva-bench-", dir=work_dir) as tmp:
+        start = time.perf_counter()
+        bench_config = make_tree(drs_config, tmp, shape, structures=structures)
+        root = Path(tmp) / "data"
+        print(
+            f"Generated {shape.num_files} files in "
+            f"{time.perf_counter() - start:.1f}s",
+            file=sys.stderr,
+        )
+        results = []
+        with SolrStub() as solr:
+            kwargs.update(host=solr.host, port=solr.port)
+            for name in benchmarks:
+                with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                    result = pool.submit(
+                        _run, name, str(bench_config), root, kwargs
+                    ).result()
+                print(
+                    "{benchmark:>14}: {files:>9} files {seconds:>9.3f}s "
+                    "{files_per_second:>11.1f} files/s "
+                    "{peak_rss_mib:>9.1f} MiB peak RSS".format(**result),
+                    file=sys.stderr,
+                )
+                results.append(result)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the crawling and ingestion of data.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--drs-config",
+        type=Path,
+        default=Path(__file__).parent / "drs_config.toml",
+        help="DRS config the trees are generated from.",
+    )
+    parser.add_argument(
+        "--structures",
+        nargs="+",
+        default=None,
+        help="DRS structures of the config to generate, defaults to all.",
+    )
+    parser.add_argument("--files", type=int, default=10_000, help="Number of files.")
+    parser.add_argument(
+        "--files-per-dataset", type=int, default=20, help="Files per dataset version."
+    )
+    parser.add_argument(
+        "--versions", type=int, default=2, help="Versions of every dataset."
+    )
+    parser.add_argument(
+        "--fanout", type=int, default=4, help="Values of every DRS directory level."
+    )
+    parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        choices=BENCHMARKS,
+        default=list(BENCHMARKS),
+        help="The benchmarks to run.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Crawl processes of load_fs."
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=10000, help="Documents per request."
+    )
+    parser.add_argument(
+        "--compress", action="store_true", help="Gzip compress the requests."
+    )
+    parser.add_argument(
+        "--work-dir", type=Path, default=None, help="Where the tree is generated."
+    )
+    parser.add_argument(
+        "--json", type=Path, default=None, help="Write the results to this file."
+    )
+    args = parser.parse_args(argv)
+    results = run_benchmarks(
+        TreeShape(args.files, args.files_per_dataset, args.versions, args.fanout),
+        args.drs_config,
+        args.benchmarks,
+        structures=args.structures,
+        work_dir=args.work_dir,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        compress=args.compress,
+    )
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""A lightweight stand-in for the solr update and select endpoints.
+
+The stand-in keeps the unique keys of the posted documents in memory and
+answers the requests the ingestion makes: core status, json updates
+(documents, delete by id and by query, commits) and document counts. It
+runs in a separate process so that it doesn't compete with the measured
+code for the interpreter.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import multiprocessing as mp
+import re
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Set, Tuple
+
+
+class SolrStubHandler(BaseHTTPRequestHandler):
+    """Handle the solr requests of the ingestion."""
+
+    protocol_version = "HTTP/1.1"
+    cores: Dict[str, Set[str]] = {}
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, obj: dict) -> None:
+        body = json.dumps({"responseHeader": {"status": 0}, **obj}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            pieces = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                pieces.append(self.rfile.read(size))
+                self.rfile.readline()
+            data = b"".join(pieces)
+        else:
+            data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        return data
+
+    def _delete_query(self, docs: Set[str], query: str) -> None:
+        if query in ("*", "*:*"):
+            docs.clear()
+            return
+        _, _, pattern = query.partition(":")
+        regex = re.compile(
+            re.escape(pattern.replace("\\", "")).replace("\\*", ".*") + "$"
+        )
+        docs.difference_update({d for d in docs if regex.match(d)})
+
+    def do_POST(self) -> None:
+        core = urllib.parse.urlparse(self.path).path.split("/")[2]
+        docs = self.cores.setdefault(core, set())
+        payload = json.loads(self._read_body() or b"{}")
+        if isinstance(payload, list):
+            docs.update(doc["file"] for doc in payload)
+        elif isinstance(payload.get("delete"), list):
+            docs.difference_update(payload["delete"])
+        elif isinstance(payload.get("delete"), dict):
+            self._delete_query(docs, payload["delete"]["query"])
+        self._send({})
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        parts = url.path.split("/")
+        if parts[2] == "admin":
+            core = query.get("core", [""])[0]
+            self.cores.setdefault(core, set())
+            status = {"instanceDir": core, "dataDir": "data"}
+            return self._send({"status": {core: status}})
+        docs = self.cores.setdefault(parts[2], set())
+        if parts[3] == "schema":
+            fields = [{"name": "file", "type": "string"}]
+            return self._send({"schema": {"fields": fields}})
+        self._send({"response": {"numFound": len(docs), "start": 0, "docs": []}})
+
+
+def _serve(port: int, ready: mp.Queue) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", port), SolrStubHandler)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class SolrStub:
+    """Run the solr stand-in in a background process.
+
+    Parameters
+    ----------
+    port:
+        The port of the stand-in, a free port is chosen by default.
+    """
+
+    def __init__(self, port: int = 0) -> None:
+        ctx = mp.get_context("spawn")
+        ready: mp.Queue = ctx.Queue()
+        self._process: Optional[mp.process.BaseProcess] = ctx.Process(
+            target=_serve, args=(port, ready), daemon=True
+        )
+        self._process.start()
+        self.port: int = ready.get(timeout=30)
+        self.host = "127.0.0.1"
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Host name and port of the stand-in."""
+        return self.host, self.port
+
+    def __enter__(self) -> SolrStub:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the stand-in."""
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import os
 from datetime import date
+from fnmatch import fnmatch
 from pathlib import Path
 from typing import Any, Collection, Generator, Iterator, Union, cast
 
@@ -12,6 +13,7 @@ import lazy_import
 
 from evaluation_system.misc import config
 from evaluation_system.misc.exceptions import ConfigurationException
+from evaluation_system.misc.utils import is_zarr_store, scan_dir
 
 xr = lazy_import.lazy_module("xarray")
 
@@ -59,7 +61,11 @@ class DataReader:
         return get_output_directory()
 
     def __iter__(self) -> Generator[Path, None, None]:
-        """Iterate over all found data files."""
+        """Iterate over all found data files.
+
+        Zarr stores are returned as a whole, their content is not searched.
+        Symlinked directories are not followed.
+        """
         file_iter: Union[Iterator[os.PathLike], Collection[os.PathLike]] = []
         if isinstance(self.paths, (list, tuple, set)):
             file_iter = self.paths
@@ -68,13 +74,24 @@ class DataReader:
             if paths.is_file():
                 file_iter = [paths]
             elif paths.is_dir():
-                file_iter = paths.rglob("*")
-            else:
+                file_iter = (
+                    f
+                    for f, _ in scan_dir(
+                        paths, suffixes=self.suffixes, followlinks=False
+                    )
+                )
+            elif paths.parent.is_dir():
                 # This is a shot into the dark assumes that the paths variable
                 # is a glob pattern
-                file_iter = paths.parent.rglob(paths.name)
+                file_iter = (
+                    f
+                    for f, _ in scan_dir(
+                        paths.parent, suffixes=self.suffixes, followlinks=False
+                    )
+                    if fnmatch(f.name, paths.name)
+                )
         for file in map(Path, file_iter):
-            if file.suffix in self.suffixes:
+            if file.suffix in self.suffixes or is_zarr_store(file):
                 yield file.expanduser().absolute()
 
     @property
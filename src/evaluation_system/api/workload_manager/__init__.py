@@ -69,6 +69,7 @@ def schedule_job(
     log_directory: Union[Path, str],
     delete_job_script: bool = True,
     config_file: Optional[Path] = None,
+    scheduler: Optional[str] = None,
 ) -> JobStatus:
     """Create a scheduler object from a given scheduler configuration.
 
@@ -80,6 +81,9 @@ def schedule_job(
         Path the to source script that activates freva
     config:
         Configuration to setup a job that is submitted to the workload manager
+    scheduler:
+        The command that is executed by the job with the ``args`` of the
+        configuration, defaults to ``freva-plugin``.
 
     Returns
     -------
@@ -107,6 +111,7 @@ def schedule_job(
         freva_args=cast(List[str], config.get("args")),
         delete_job_script=delete_job_script,
         env_extra=env_extra,
+        scheduler=scheduler,
     )
     std_err = ""
     submit_status = 0
@@ -5,10 +5,11 @@ from __future__ import annotations
 import logging
 import os
 import subprocess
+from contextlib import contextmanager
 from pathlib import Path
-from typing import ClassVar, Optional
+from typing import ClassVar, Iterator, Optional
 
-from .core import Job
+from .core import Job, tmpfile
 
 logger = logging.getLogger(__name__)
 
@@ -64,8 +65,23 @@ class LocalJob(Job):
             out_file = Path(self.log_directory) / f"{self.job_name}-$PID.out"
             self._command_template += f" &> {out_file} &\n"
         self._command_template += "PLUGIN_ID=$!\nwait $PLUGIN_ID"
+        if self.delete_job_script:
+            self._command_template += '\nrm -f "$0"'
         logger.debug(f"Job script: \n {self.job_script()}")
 
+    @contextmanager
+    def job_file(self) -> Iterator[Path]:
+        """Write the job script to a file that is kept after submission.
+
+        The script is read by the background process after it has been
+        submitted, it hence removes itself once the job has finished.
+        """
+        with tmpfile(suffix=".sh", delete=False) as fn:
+            with open(fn, "w") as f:
+                logger.debug("writing job script: \n%s", self.job_script())
+                f.write(self.job_script())
+            yield Path(fn)
+
     def _submit_job(self, script_filename):
         # Should we make this async friendly?
         cmd = ["/usr/bin/env", "bash", script_filename]
@@ -6,14 +6,16 @@ This module manages the central configuration of the system.
 
 from __future__ import annotations
 
+import copy
 import hashlib
 import os
 import os.path as osp
 import sys
+import threading
 import warnings
 from configparser import ConfigParser, ExtendedInterpolation, NoSectionError
 from pathlib import Path
-from typing import Optional, Sequence, Union
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
 
 import appdirs
 import requests
@@ -147,6 +149,24 @@ SOLR_PORT = "solr.port"
 SOLR_CORE = "solr.core"
 """Core name of the Solr instance."""
 
+SOLR_TIMEOUT = "solr.timeout"
+"""Timeout in seconds of requests to the Solr instance."""
+
+SOLR_RETRIES = "solr.retries"
+"""Number of retries of failed idempotent requests to the Solr instance."""
+
+SOLR_CACHE_TTL = "solr.cache_ttl"
+"""Time in seconds facet and count query results are cached, 0 disables it."""
+
+SOLR_CACHE_SIZE = "solr.cache_size"
+"""Maximum number of facet and count query results cached in memory."""
+
+SOLR_DISK_CACHE = "solr.disk_cache"
+"""Share cached query results between processes in the user cache directory."""
+
+SOLR_METADATA_TTL = "solr.metadata_ttl"
+"""Time in seconds the schema fields and status of Solr cores are cached."""
+
 
 _config = None
 _drs_config = None
@@ -202,6 +222,7 @@ def reloadConfiguration(config_file: Union[str, Path, None] = None) -> None:
     for testing, since the framework is restarted every time an analysis is
     performed."""
     global _config
+    clear_drs_config_cache()
     _config = {
         BASE_DIR: "evaluation_system",
         BASE_DIR_LOCATION: os.path.expanduser("~"),
@@ -348,16 +369,58 @@ def get_section(section_name, config_file=None):
     return SPECIAL_VARIABLES.substitute(section)
 
 
-def get_drs_config():
+_drs_config_cache: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+"""Parsed DRS configurations and the signatures of their files."""
+_drs_config_lock = threading.Lock()
+
+
+def get_drs_config_file() -> str:
+    """Get the path to the DRS configuration file."""
     default_drs_dir = Path(
         os.environ.get("EVALUATION_SYSTEM_CONFIG_FILE", CONFIG_FILE)
     ).parent
-    drs_config = os.environ.get(
+    return os.environ.get(
         "EVALUATION_SYSTEM_DRS_CONFIG_FILE",
         str(default_drs_dir / "drs_config.toml"),
     )
-    with open(drs_config, "r") as drs_file:
-        _drs_config = toml.load(drs_file)
-    for key in _drs_config:
-        _drs_config[key].setdefault("root_path", _drs_config[key].get("root_dir", ""))
-    return _drs_config
+
+
+def clear_drs_config_cache() -> None:
+    """Drop the cached DRS configurations, they are read again on next use."""
+    with _drs_config_lock:
+        _drs_config_cache.clear()
+
+
+def get_drs_config(reload: bool = False) -> Dict[str, Any]:
+    """Get the DRS configuration.
+
+    The parsed configuration is cached for the whole process, the file is
+    only read again if its modification time or size changes.
+
+    Parameters
+    ----------
+    reload:
+        Read the configuration file even if it didn't change.
+
+    Returns
+    -------
+    dict:
+        A copy of the configuration, changing it doesn't affect the cache.
+    """
+    drs_config = get_drs_config_file()
+    stat = os.stat(drs_config)
+    signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    with _drs_config_lock:
+        cached = _drs_config_cache.get(drs_config)
+    if reload or cached is None or cached[0] != signature:
+        log.debug("Loading DRS configuration from: %s", drs_config)
+        with open(drs_config, "r") as drs_file:
+            _drs_config = toml.load(drs_file)
+        for key in _drs_config:
+            _drs_config[key].setdefault(
+                "root_path", _drs_config[key].get("root_dir", "")
+            )
+        cached = (signature, _drs_config)
+        with _drs_config_lock:
+            _drs_config_cache[drs_config] = cached
+    return copy.deepcopy(cached[1])
@@ -7,11 +7,24 @@ import errno
 import os
 import shlex
 from copy import deepcopy
+from dataclasses import asdict, dataclass
 from difflib import get_close_matches
+from pathlib import Path
 from re import split
 from string import Template
 from subprocess import PIPE, run
-from typing import IO, Any, Dict, Iterable, List, TextIO, Union
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
 
 
 def run_cmd(cmd: str, **kwargs: Any) -> str:
@@ -556,3 +569,277 @@ class initOrder(object):
 
     def initCompare(self, other):
         return self.__number - other.__number
+
+
+@dataclass
+class WalkStats:
+    """Counters of a directory walk."""
+
+    dirs: int = 0
+    """Number of directories that have been scanned."""
+    files: int = 0
+    """Number of files that have been yielded."""
+    skipped_suffix: int = 0
+    """Number of files that were skipped because of their suffix."""
+    duplicates: int = 0
+    """Number of links to already visited files or directories."""
+    stat_calls: int = 0
+    """Number of stat calls that were made by the walk."""
+    stat_calls_saved: int = 0
+    """Number of stat calls saved by handing the stat result of the walk
+    to the consumer and by not visiting duplicated files or directories."""
+
+    def update(self, other: WalkStats) -> None:
+        """Add the counters of another walk."""
+        for key, value in asdict(other).items():
+            setattr(self, key, getattr(self, key) + value)
+
+
+ZARR_MARKERS: Tuple[str, ...] = (".zgroup", ".zarray", "zarr.json")
+"""Files that mark the root of a zarr store."""
+
+
+def is_zarr_store(path: os.PathLike) -> bool:
+    """Check if a path is a zarr store.
+
+    A zarr store is a directory that either has a ``.zarr`` suffix or
+    holds zarr metadata files.
+    """
+    path = Path(path)
+    if not path.is_dir():
+        return False
+    if path.suffix == ".zarr":
+        return True
+    return any((path / marker).exists() for marker in ZARR_MARKERS)
+
+
+def walked_before(
+    path: Union[str, os.PathLike], position: Union[str, os.PathLike], is_file: bool
+) -> bool:
+    """Check if a path is visited before a position of a :func:`scan_dir` walk.
+
+    Parameters
+    ----------
+    path:
+        The file or directory that is checked, a directory is only visited
+        before the position if its whole sub tree is.
+    position:
+        The path of a file yielded by the walk.
+    is_file:
+        If the checked path is yielded as a file by the walk.
+    """
+    parts, pos_parts = Path(path).parts, Path(position).parts
+    if parts == pos_parts:
+        return True
+    common = 0
+    for part, pos_part in zip(parts, pos_parts):
+        if part != pos_part:
+            break
+        common += 1
+    if common == len(parts) or common == len(pos_parts):
+        # ancestor of the position, its sub tree is only partly visited
+        return False
+    # files of a directory are visited before its sub directories, both in
+    # reverse order of their names
+    path_is_dir = common < len(parts) - 1 or not is_file
+    pos_is_dir = common < len(pos_parts) - 1
+    if path_is_dir != pos_is_dir:
+        return pos_is_dir
+    return parts[common] > pos_parts[common]
+
+
+def scan_dir(
+    start_dir: Union[str, os.PathLike],
+    suffixes: Optional[Tuple[str, ...]] = None,
+    followlinks: bool = True,
+    recursive: bool = True,
+    stats: Optional[WalkStats] = None,
+    resume_after: Optional[Union[str, os.PathLike]] = None,
+) -> Iterator[Tuple[Path, os.stat_result]]:
+    """Walk a directory tree with :func:`os.scandir`.
+
+    The files of a directory are yielded before its sub directories are
+    visited, both in reverse order of their names (latest version first).
+    Files are filtered by their suffix before they are stat'ed and the
+    stat result is yielded along with the path so that it doesn't have to
+    be retrieved again. The ``(st_dev, st_ino)`` pairs of all visited
+    directories and of linked files are remembered to skip symlink loops
+    and duplicated links.
+
+    Zarr stores are yielded like files and never descended into.
+    Directories with a ``.zarr`` suffix are treated as files of their
+    parent directory, other directories are recognised as zarr stores by
+    their metadata files (see :data:`ZARR_MARKERS`) once they are scanned.
+
+    Parameters
+    ----------
+    start_dir:
+        The directory that is walked.
+    suffixes:
+        Only yield files with these suffixes, if None yield all files.
+        Zarr stores without a ``.zarr`` suffix are yielded if ``.zarr``
+        is part of the suffixes.
+    followlinks:
+        Descend into symlinked directories.
+    recursive:
+        Walk sub directories.
+    stats:
+        Counters that are updated during the walk.
+    resume_after:
+        Resume an interrupted walk: skip all files and sub trees that are
+        visited before this file.
+
+    Yields
+    ------
+    tuple[Path, os.stat_result]:
+        The path and the stat result of each file.
+    """
+    stats = stats or WalkStats()
+    start_dir = os.fspath(start_dir)
+    if resume_after is not None and walked_before(start_dir, resume_after, False):
+        return
+    start_stat = os.stat(start_dir)
+    stats.stat_calls += 1
+    if os.path.splitext(start_dir)[-1] == ".zarr":
+        stats.files += 1
+        yield Path(start_dir), start_stat
+        return
+    visited_dirs = {(start_stat.st_dev, start_stat.st_ino)}
+    visited_files = set()
+    stack = [(start_dir, start_stat)]
+    while stack:
+        base_dir, base_stat = stack.pop()
+        try:
+            with os.scandir(base_dir) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        stats.dirs += 1
+        if any(entry.name in ZARR_MARKERS for entry in entries):
+            if suffixes is None or ".zarr" in suffixes:
+                stats.files += 1
+                yield Path(base_dir), base_stat
+            continue
+        sub_dirs, files = [], []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir and os.path.splitext(entry.name)[-1] != ".zarr":
+                sub_dirs.append(entry)
+            else:
+                files.append(entry)
+        for entry in sorted(files, key=lambda e: e.name, reverse=True):
+            if (
+                suffixes is not None
+                and os.path.splitext(entry.name)[-1] not in suffixes
+            ):
+                stats.skipped_suffix += 1
+                continue
+            if resume_after is not None and walked_before(
+                entry.path, resume_after, True
+            ):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                # broken link
+                continue
+            stats.stat_calls += 1
+            file_id = (stat.st_dev, stat.st_ino)
+            if file_id in visited_files:
+                stats.duplicates += 1
+                stats.stat_calls_saved += 1
+                continue
+            if stat.st_nlink > 1 or entry.is_symlink():
+                visited_files.add(file_id)
+            stats.files += 1
+            stats.stat_calls_saved += 1
+            yield Path(entry.path), stat
+        if not recursive:
+            break
+        for entry in sorted(sub_dirs, key=lambda e: e.name):
+            if entry.is_symlink() and not followlinks:
+                continue
+            if resume_after is not None and walked_before(
+                entry.path, resume_after, False
+            ):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            stats.stat_calls += 1
+            dir_id = (stat.st_dev, stat.st_ino)
+            if dir_id in visited_dirs:
+                stats.duplicates += 1
+                continue
+            visited_dirs.add(dir_id)
+            stack.append((entry.path, stat))
+
+
+def _split_records(
+    stream: IO[bytes], separator: Optional[bytes], block_size: int = 1024 * 1024
+) -> Iterator[bytes]:
+    """Split a binary stream into records, guess the separator if not given."""
+    rest = b""
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        if separator is None:
+            separator = b"\0" if b"\0" in block else b"\n"
+        records = (rest + block).split(separator)
+        rest = records.pop()
+        yield from records
+    yield rest
+
+
+def read_inventory(
+    inventory: Union[str, os.PathLike, IO[bytes]],
+    separator: Optional[bytes] = None,
+) -> Iterator[Tuple[Path, Optional[os.stat_result]]]:
+    """Read a precomputed list of files, for example the output of ``find``.
+
+    Each record of the inventory holds one path, records are either
+    separated by new lines or by NUL characters. A record can optionally
+    have tab separated size and modification time columns before the path,
+    as created by ``find <dir> -type f -printf '%s\\t%T@\\t%p\\n'``.
+
+    Parameters
+    ----------
+    inventory:
+        Path to the inventory file or a binary stream, like ``sys.stdin.buffer``.
+    separator:
+        The record separator, if None NUL separated records are detected
+        automatically, new lines are assumed otherwise.
+
+    Yields
+    ------
+    tuple[Path, os.stat_result]:
+        The path of the file and, if size and modification time are part
+        of the inventory, a stat result holding them.
+    """
+    if isinstance(inventory, (str, bytes, os.PathLike)):
+        with open(inventory, "rb") as stream:
+            yield from read_inventory(stream, separator=separator)
+        return
+    for record in _split_records(inventory, separator):
+        record = record.rstrip(b"\r")
+        if not record.strip():
+            continue
+        stat: Optional[os.stat_result] = None
+        columns = record.split(b"\t", 2)
+        if len(columns) == 3:
+            try:
+                size, mtime = int(columns[0]), float(columns[1])
+            except ValueError:
+                pass
+            else:
+                stat = os.stat_result(
+                    (0, 0, 0, 0, 0, 0, size, int(mtime), int(mtime), int(mtime))
+                    + (mtime, mtime, mtime)
+                )
+                record = columns[2]
+        yield Path(os.fsdecode(record)), stat
@@ -0,0 +1,309 @@
+"""Persistent record of crawled files for incremental ingestion.
+
+The manifest keeps the inode, size and modification time of every file
+that has been crawled below a directory. A subsequent crawl of the same
+directory only has to ingest the files whose signature has changed and
+delete the entries of files that have vanished since.
+
+For files of versioned datasets the manifest also keeps the dataset and
+version, together with the version of every dataset that is held by the
+*latest* core. A crawl that only sees some files of a dataset can hence
+tell whether they belong to the latest version and which entries a new
+version supersedes.
+
+Crawl checkpoints record how far a running crawl has got, an interrupted
+crawl can be resumed from its last checkpoint.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from evaluation_system.misc import config
+
+CRAWL_MANIFEST_FILE = Path(config.USER_CONFIG_FILE_LOC).parent / "crawl_manifest.sqlite"
+"""Default location of the crawl manifest, next to the user configuration."""
+
+CRAWL_CHECKPOINT_DIR = Path(config.USER_CONFIG_FILE_LOC).parent / "crawl_checkpoints"
+"""Default location of the crawl checkpoints, next to the user configuration."""
+
+FileSignature = Tuple[str, int, int, float]
+"""Path, inode, size and modification time of a file."""
+
+
+def _range_bounds(root: str) -> Tuple[str, str]:
+    """Get the lower and upper bounds of all paths below a directory.
+
+    All paths below ``root`` start with ``root/``, since ``0`` is the
+    character following ``/`` they are sorted between the two bounds.
+    """
+    root = root.rstrip(os.sep)
+    return root + os.sep, root + chr(ord(os.sep) + 1)
+
+
+class CrawlManifest:
+    """SQLite backed record of the files that have been ingested.
+
+    All changes are kept in a transaction until :meth:`commit` is called,
+    a crawl that fails therefore leaves the manifest untouched.
+
+    Parameters
+    ----------
+    db_file:
+        Path to the SQLite database, defaults to :data:`CRAWL_MANIFEST_FILE`.
+    readonly:
+        Open the database read only, this is used by crawl worker processes.
+    """
+
+    def __init__(
+        self, db_file: Optional[os.PathLike] = None, readonly: bool = False
+    ) -> None:
+        self.db_file = Path(db_file or CRAWL_MANIFEST_FILE).expanduser().absolute()
+        self.readonly = readonly
+        if readonly:
+            self._con = sqlite3.connect(
+                f"file:{self.db_file}?mode=ro", uri=True, timeout=60
+            )
+            self.generation = 0
+            return
+        self.db_file.parent.mkdir(exist_ok=True, parents=True)
+        self._con = sqlite3.connect(str(self.db_file), timeout=60)
+        # WAL allows the crawl workers to read while a crawl is writing.
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, "
+            "inode INTEGER, size INTEGER, mtime REAL, generation INTEGER, "
+            "dataset TEXT, version TEXT)"
+        )
+        columns = {row[1] for row in self._con.execute("PRAGMA table_info(files)")}
+        for column in ("dataset", "version"):
+            # manifests written by older versions
+            if column not in columns:
+                self._con.execute(f"ALTER TABLE files ADD COLUMN {column} TEXT")
+        self._con.execute(
+            "CREATE INDEX IF NOT EXISTS files_dataset ON files (dataset, version)"
+        )
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS latest (dataset TEXT PRIMARY KEY, version TEXT)"
+        )
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS crawls "
+            "(generation INTEGER PRIMARY KEY AUTOINCREMENT, root TEXT)"
+        )
+        self._con.commit()
+        self.generation = 0
+
+    def __enter__(self) -> CrawlManifest:
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        if exc_type is not None:
+            self.rollback()
+        self.close()
+
+    def start(self, root: os.PathLike) -> None:
+        """Begin a new crawl of a directory.
+
+        Every file recorded during this crawl is tagged with a new
+        generation number, files of the directory that carry an older
+        generation have not been seen and are considered vanished.
+        """
+        cursor = self._con.execute("INSERT INTO crawls (root) VALUES (?)", (str(root),))
+        self.generation = int(cursor.lastrowid or 0)
+
+    def has_entries(self, root: os.PathLike) -> bool:
+        """Check if any file in or below ``root`` has been recorded."""
+        lower, upper = _range_bounds(str(root))
+        row = self._con.execute(
+            "SELECT 1 FROM files WHERE path = ? OR (path > ? AND path < ?) LIMIT 1",
+            (str(root), lower, upper),
+        ).fetchone()
+        return row is not None
+
+    def is_unchanged(self, signature: FileSignature) -> bool:
+        """Check if a file has the same signature as recorded."""
+        row = self._con.execute(
+            "SELECT inode, size, mtime FROM files WHERE path = ?", (signature[0],)
+        ).fetchone()
+        return row is not None and tuple(row) == tuple(signature[1:])
+
+    def record(self, signature: FileSignature) -> bool:
+        """Record a file that has been seen in the current crawl.
+
+        Returns
+        -------
+        bool:
+            True if the file is new or has changed since the last crawl.
+        """
+        changed = not self.is_unchanged(signature)
+        if changed:
+            self._con.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, NULL, NULL)",
+                (*signature, self.generation),
+            )
+        else:
+            self._con.execute(
+                "UPDATE files SET generation = ? WHERE path = ?",
+                (self.generation, signature[0]),
+            )
+        return changed
+
+    def vanished(self, root: os.PathLike) -> Iterator[str]:
+        """Get all files in or below ``root`` not seen in the current crawl."""
+        lower, upper = _range_bounds(str(root))
+        cursor = self._con.execute(
+            "SELECT path FROM files WHERE (path = ? OR (path > ? AND path < ?)) "
+            "AND generation != ?",
+            (str(root), lower, upper, self.generation),
+        )
+        for (path,) in cursor.fetchall():
+            yield path
+
+    def set_dataset(self, path: str, dataset: str, version: str) -> None:
+        """Record the dataset and version of a file of a versioned dataset."""
+        self._con.execute(
+            "UPDATE files SET dataset = ?, version = ? WHERE path = ?",
+            (dataset, version, path),
+        )
+
+    def latest_version(self, dataset: str) -> Optional[str]:
+        """Get the version of a dataset that is held by the latest core."""
+        row = self._con.execute(
+            "SELECT version FROM latest WHERE dataset = ?", (dataset,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def set_latest(self, dataset: str, version: Optional[str]) -> None:
+        """Record the version of a dataset held by the latest core.
+
+        A version of None removes the dataset.
+        """
+        if version is None:
+            self._con.execute("DELETE FROM latest WHERE dataset = ?", (dataset,))
+        else:
+            self._con.execute(
+                "INSERT OR REPLACE INTO latest VALUES (?, ?)", (dataset, version)
+            )
+
+    def older_files(self, dataset: str, version: str) -> List[str]:
+        """Get the files of all versions of a dataset older than ``version``."""
+        cursor = self._con.execute(
+            "SELECT path FROM files WHERE dataset = ? AND version < ?",
+            (dataset, version),
+        )
+        return [path for (path,) in cursor.fetchall()]
+
+    def newest_files(self, dataset: str) -> Tuple[Optional[str], List[str]]:
+        """Get the newest recorded version of a dataset and its files."""
+        row = self._con.execute(
+            "SELECT MAX(version) FROM files WHERE dataset = ?", (dataset,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None, []
+        cursor = self._con.execute(
+            "SELECT path FROM files WHERE dataset = ? AND version = ?",
+            (dataset, row[0]),
+        )
+        return row[0], [path for (path,) in cursor.fetchall()]
+
+    def remove(self, paths: Iterable[str]) -> Set[str]:
+        """Remove files from the manifest.
+
+        Returns
+        -------
+        set:
+            The datasets whose latest version has no files left.
+        """
+        datasets: Set[str] = set()
+        for path in paths:
+            row = self._con.execute(
+                "SELECT dataset FROM files WHERE path = ?", (path,)
+            ).fetchone()
+            if row is not None and row[0] is not None:
+                datasets.add(row[0])
+            self._con.execute("DELETE FROM files WHERE path = ?", (path,))
+        return {
+            dataset
+            for dataset in datasets
+            if self._con.execute(
+                "SELECT 1 FROM files JOIN latest USING (dataset, version) "
+                "WHERE dataset = ? LIMIT 1",
+                (dataset,),
+            ).fetchone()
+            is None
+        }
+
+    def commit(self) -> None:
+        """Persist the changes of the current crawl."""
+        self._con.commit()
+
+    def rollback(self) -> None:
+        """Discard the changes of the current crawl."""
+        self._con.rollback()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._con.close()
+
+
+def file_signature(path: os.PathLike, stat: os.stat_result) -> FileSignature:
+    """Create the signature of a file from its stat result."""
+    return str(path), stat.st_ino, stat.st_size, stat.st_mtime
+
+
+class CrawlCheckpoint:
+    """Position of a running crawl that can be used to resume it.
+
+    The checkpoint of a crawled directory is kept in its own directory
+    that also holds the state of the latest version resolution of the
+    crawl (see :attr:`resolver_db`).
+
+    Parameters
+    ----------
+    input_dir:
+        The directory that is crawled.
+    checkpoint_dir:
+        Parent directory of all checkpoints, defaults to
+        :data:`CRAWL_CHECKPOINT_DIR`.
+    """
+
+    def __init__(
+        self, input_dir: os.PathLike, checkpoint_dir: Optional[os.PathLike] = None
+    ) -> None:
+        self.input_dir = str(input_dir)
+        key = hashlib.sha1(self.input_dir.encode()).hexdigest()
+        self.path = (
+            Path(checkpoint_dir or CRAWL_CHECKPOINT_DIR).expanduser().absolute() / key
+        )
+        self.last_file: Optional[str] = None
+        try:
+            state = json.loads((self.path / "checkpoint.json").read_text())
+        except (OSError, ValueError):
+            return
+        if state.get("input_dir") == self.input_dir:
+            self.last_file = state.get("last_file")
+
+    @property
+    def resolver_db(self) -> Path:
+        """Database of the latest version resolution of the crawl."""
+        return self.path / "latest.sqlite"
+
+    def save(self, last_file: str) -> None:
+        """Persist the path of the last file whose metadata has been ingested."""
+        self.path.mkdir(exist_ok=True, parents=True)
+        state = {"input_dir": self.input_dir, "last_file": last_file}
+        tmp_file = self.path / "checkpoint.json.tmp"
+        tmp_file.write_text(json.dumps(state))
+        tmp_file.replace(self.path / "checkpoint.json")
+        self.last_file = last_file
+
+    def remove(self) -> None:
+        """Delete the checkpoint, once the crawl has finished."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.last_file = None
@@ -0,0 +1,268 @@
+"""Distributed crawl of directory trees via the workload manager.
+
+The coordinator splits the crawled directory into sub tree work units and
+submits one job per unit through
+:func:`evaluation_system.api.workload_manager.schedule_job`. Each job crawls
+its sub trees, posts the metadata of all files to the files core and keeps
+the candidates for the latest core in a resolver database. Once all jobs
+have finished the coordinator resolves the newest version of every dataset,
+sends it to the latest core and commits both cores.
+
+The jobs and the coordinator exchange their state through a work directory
+that has to be accessible from all nodes the jobs are running on.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from evaluation_system.api.workload_manager import schedule_job
+from evaluation_system.misc import config
+from evaluation_system.misc import logger as log
+from evaluation_system.model.file import DRSFile
+from evaluation_system.model.ingest_stats import IngestStats
+from evaluation_system.model.latest_version import LatestVersionResolver
+from evaluation_system.model.solr_core import (
+    CommitStrategy,
+    IngestPipeline,
+    ShardCrawler,
+    SolrCore,
+    get_solr_core,
+    split_crawl_dir,
+)
+
+CRAWL_PARAMS = "crawl.pickle"
+"""Name of the file holding the parameters of the crawl in the work directory."""
+
+
+def _unit_file(work_dir: Path, unit: int, suffix: str) -> Path:
+    return work_dir / f"unit-{unit:04d}.{suffix}"
+
+
+def load_fs_distributed(
+    input_dir: os.PathLike,
+    num_jobs: int = 4,
+    drs_type: Optional[str] = None,
+    chunk_size: int = 10000,
+    suffix: Tuple[str, ...] = (".nc", ".grb", ".zarr", ".grib", ".nc4"),
+    core: Optional[str] = None,
+    core_latest: Optional[SolrCore] = None,
+    core_all_files: Optional[SolrCore] = None,
+    abort_on_errors: bool = False,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    workers: int = 1,
+    commit: CommitStrategy = "within",
+    commit_within: int = 60_000,
+    compress: bool = False,
+    system: Optional[str] = None,
+    job_config: Optional[Dict[str, Union[str, List[str]]]] = None,
+    work_dir: Optional[os.PathLike] = None,
+    timeout: Optional[float] = None,
+    poll_interval: float = 10.0,
+    shards_per_job: int = 16,
+) -> Dict[str, int]:
+    """Crawl a directory with jobs submitted to the workload manager.
+
+    Parameters
+    ----------
+    input_dir:
+        Directory that is crawled.
+    num_jobs:
+        Number of jobs the crawl is split into.
+    workers:
+        Number of processes each job uses for crawling.
+    system:
+        The workload manager system (local, slurm, pbs, ...), defaults to
+        the ``scheduler_system`` configuration.
+    job_config:
+        Options of the jobs (cpus, memory, walltime, queue, project, ...)
+        that update the ``scheduler_options`` configuration.
+    work_dir:
+        Parent of the work directory that is shared by the coordinator and
+        the jobs, defaults to the ``scheduler_output_dir``. The work
+        directory is removed after a successful crawl.
+    timeout:
+        Maximum time in seconds to wait for the jobs, wait forever if None.
+    poll_interval:
+        Time in seconds between checking the state of the jobs.
+    shards_per_job:
+        Number of sub trees each job crawls, more sub trees balance the load
+        of the jobs better.
+    commit:
+        The commit strategy of the jobs, by default solr commits the data
+        of all jobs within ``commit_within`` milliseconds instead of every
+        job committing every chunk.
+
+    See :meth:`SolrCore.load_fs` for all other parameters.
+
+    Returns
+    -------
+    dict:
+        Number of crawled files and directories of all jobs.
+
+    Raises
+    ------
+    RuntimeError:
+        If a job could not be submitted or failed.
+    TimeoutError:
+        If the jobs did not finish within ``timeout`` seconds.
+    """
+    commit_kwargs = SolrCore._commit_kwargs(commit, commit_within)
+    core_latest = core_latest or get_solr_core(core="latest", host=host, port=port)
+    core_all_files = core_all_files or get_solr_core(core=core, host=host, port=port)
+    input_dir = Path(input_dir).expanduser().absolute()
+    work_parent = Path(
+        work_dir or Path(config.get(config.SCHEDULER_OUTPUT_DIR)) / "crawl"
+    )
+    work_parent.mkdir(exist_ok=True, parents=True)
+    work_path = Path(tempfile.mkdtemp(prefix="crawl-", dir=work_parent))
+    # Make sure the structures are loaded before handing them to the jobs
+    DRSFile._get_structure_prefix_map()
+    shards = split_crawl_dir(input_dir, num_jobs * shards_per_job)
+    units = [u for u in (shards[num::num_jobs] for num in range(num_jobs)) if u]
+    params: Dict[str, Any] = dict(
+        units=units,
+        structures=DRSFile.DRS_STRUCTURE,
+        path_types=DRSFile.DRS_STRUCTURE_PATH_TYPE,
+        cores=[
+            (c.core, c.host, c.port, c.timeout) for c in (core_all_files, core_latest)
+        ],
+        abort_on_errors=abort_on_errors,
+        suffix=suffix,
+        drs_type=drs_type,
+        chunk_size=chunk_size,
+        workers=workers,
+        post_kwargs={**commit_kwargs, "compress": compress},
+    )
+    with (work_path / CRAWL_PARAMS).open("wb") as stream:
+        pickle.dump(params, stream)
+    core_latest._del_file_pattern(input_dir, **commit_kwargs)
+    core_all_files._del_file_pattern(input_dir, **commit_kwargs)
+    job_options = config.get_section("scheduler_options").copy()
+    job_options.update(job_config or {})
+    for unit in range(len(units)):
+        job_options["name"] = f"freva-crawl-{unit}"
+        job_options["args"] = [str(work_path), str(unit)]
+        status = schedule_job(
+            system or config.get("scheduler_system"),
+            Path(config.CONFIG_FILE).parent / "activate_sh",
+            job_options,
+            delete_job_script=log.root.level > logging.DEBUG,
+            log_directory=work_path / "logs",
+            config_file=Path(config.CONFIG_FILE),
+            scheduler=f"{sys.executable} -m {__name__}",
+        )
+        if status.submit_status != 0:
+            raise RuntimeError(f"Could not submit crawl job: {status.error_msg}")
+        log.info("Submitted crawl job %s (%s)", status.job_id, unit)
+    stats = _wait_for_units(work_path, len(units), timeout, poll_interval)
+    log.info("Resolving the latest versions")
+    with LatestVersionResolver() as resolver:
+        for unit in range(len(units)):
+            resolver.merge(_unit_file(work_path, unit, "sqlite"))
+        with IngestPipeline(post_kwargs=params["post_kwargs"]) as pipeline:
+            SolrCore._submit_latest(resolver, pipeline, core_latest, chunk_size)
+    core_all_files.commit()
+    core_latest.commit()
+    shutil.rmtree(work_path, ignore_errors=True)
+    log.info("Crawled %s files in %s directories", stats["files"], stats["dirs"])
+    return stats
+
+
+def _wait_for_units(
+    work_path: Path, num_units: int, timeout: Optional[float], poll_interval: float
+) -> Dict[str, int]:
+    """Wait until all work units are done, collect their statistics."""
+    start = time.monotonic()
+    pending = set(range(num_units))
+    stats = {"files": 0, "dirs": 0}
+    while pending:
+        for unit in sorted(pending):
+            failed = _unit_file(work_path, unit, "failed")
+            if failed.exists():
+                raise RuntimeError(
+                    f"Crawl job {unit} failed, the work directory {work_path} "
+                    f"is kept for inspection:\n{failed.read_text()}"
+                )
+            done = _unit_file(work_path, unit, "done")
+            if done.exists():
+                unit_stats = json.loads(done.read_text())
+                stats = {k: v + unit_stats.get(k, 0) for k, v in stats.items()}
+                pending.discard(unit)
+        if not pending:
+            break
+        if timeout is not None and time.monotonic() - start > timeout:
+            raise TimeoutError(
+                f"{len(pending)} crawl job(s) did not finish within {timeout}s"
+            )
+        time.sleep(poll_interval)
+    return stats
+
+
+def crawl_unit(work_dir: os.PathLike, unit: int) -> None:
+    """Crawl and post one work unit of a distributed crawl, run by the jobs."""
+    work_path = Path(work_dir)
+    try:
+        with (work_path / CRAWL_PARAMS).open("rb") as stream:
+            params: Dict[str, Any] = pickle.load(stream)
+        DRSFile.DRS_STRUCTURE = params["structures"]
+        DRSFile.DRS_STRUCTURE_PATH_TYPE = params["path_types"]
+        core_all_files, core_latest = (
+            SolrCore(core=core, host=host, port=port, get_status=False, timeout=tout)
+            for (core, host, port, tout) in params["cores"]
+        )
+        stats = IngestStats(progress_interval=None)
+        with ExitStack() as stack:
+            crawler = stack.enter_context(ShardCrawler(params["workers"]))
+            resolver = stack.enter_context(
+                LatestVersionResolver(_unit_file(work_path, unit, "sqlite"))
+            )
+            pipeline = stack.enter_context(
+                IngestPipeline(post_kwargs=params["post_kwargs"], stats=stats)
+            )
+            SolrCore._ingest(
+                crawler.crawl(
+                    params["units"][unit],
+                    params["abort_on_errors"],
+                    params["suffix"],
+                    params["drs_type"],
+                    stats=stats,
+                ),
+                pipeline,
+                core_all_files,
+                core_latest,
+                params["chunk_size"],
+                resolver=resolver,
+            )
+    except BaseException:
+        _unit_file(work_path, unit, "failed").write_text(traceback.format_exc())
+        raise
+    _unit_file(work_path, unit, "done").write_text(json.dumps(stats.summary()))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point of the crawl jobs."""
+    parser = argparse.ArgumentParser(
+        description="Crawl a work unit of a distributed crawl."
+    )
+    parser.add_argument("work_dir", type=Path, help="The shared work directory.")
+    parser.add_argument("unit", type=int, help="The number of the work unit.")
+    args = parser.parse_args(argv)
+    crawl_unit(args.work_dir, args.unit)
+
+
+if __name__ == "__main__":
+    main()
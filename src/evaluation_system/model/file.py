@@ -11,14 +11,32 @@ from __future__ import annotations
 import json
 import logging
 import os
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, ClassVar, Generator, Optional, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 from typing_extensions import TypedDict
 
 from evaluation_system.misc import config
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 log = logging.getLogger(__name__)
 
 
@@ -31,6 +49,9 @@ Activity = str
 
 ACTIVITY_BASELINE0: Activity = "baseline0"
 
+_STRUCTURE_KEY = ""
+"""Key of the DRS structure in a prefix trie node, can't be a path component."""
+
 
 @dataclass
 class DRSStructure:
@@ -80,6 +101,28 @@ class DRSStructure:
             "version",
             "variable",
         ]
+        self._path_layout: Optional[Tuple[_PartsLayout, Tuple[int, ...]]] = None
+
+    @property
+    def path_layout(self) -> Tuple[_PartsLayout, Tuple[int, ...]]:
+        """Layout of the components of files parsed from a path.
+
+        The components of a path are the directory parts, the file name and
+        the parts of the file name. Together with the layout the positions
+        of the values of the layout keys in the components are returned,
+        directory parts take precedence over file name parts of the same key.
+        """
+        if self._path_layout is None:
+            num_dir = len(self.parts_dir)
+            sources = dict(zip(self.parts_dir, range(num_dir)))
+            sources["file_name"] = num_dir
+            for num, key in enumerate(self.parts_file_name, num_dir + 1):
+                sources.setdefault(key, num)
+            self._path_layout = (
+                _PartsLayout.get(tuple(sources)),
+                tuple(sources.values()),
+            )
+        return self._path_layout
 
     @classmethod
     def from_dict(cls, dataset: str, drs_dict: dict[str, Any]) -> DRSStructure:
@@ -123,14 +166,261 @@ class FileComponents(TypedDict):
     parts: dict[str, str]
 
 
+@dataclass
+class DRSTable:
+    """DRS components of many files in columns, see :meth:`DRSFile.parse_many`."""
+
+    columns: Dict[str, List[Optional[str]]] = field(default_factory=dict)
+    """Values of the components, one row per file. Besides the components
+    the ``file`` column holds the path and the ``dataset`` column the name
+    of the DRS structure of each file, just like the documents of the solr
+    index. Components that are not part of the structure of a file are
+    None."""
+    errors: Dict[str, str] = field(default_factory=dict)
+    """Paths that could not be parsed and the reason why."""
+
+    def __len__(self) -> int:
+        return len(self.columns.get("file", []))
+
+    def to_pandas(self) -> pd.DataFrame:
+        """Convert the parsed components to a pandas DataFrame."""
+        import pandas as pd
+
+        return pd.DataFrame(self.columns)
+
+
+class StructurePrefixMap(Dict[str, Activity]):
+    """Map of path prefixes to the names of the DRS structures below them.
+
+    Besides the mapping itself the prefixes are kept in a trie of path
+    components. The structure of a path is resolved by its longest matching
+    prefix with one lookup per path component, independent of the number
+    of structures and of the order they are defined in.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__()
+        self._trie: dict[str, Any] = {}
+        self.update(*args, **kwargs)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return self.__class__, (dict(self),)
+
+    def __setitem__(self, path_prefix: str, activity: Activity) -> None:
+        super().__setitem__(path_prefix, activity)
+        node = self._trie
+        for part in path_prefix.split(os.sep):
+            if part:
+                node = node.setdefault(part, {})
+        node[_STRUCTURE_KEY] = activity
+
+    def __delitem__(self, path_prefix: str) -> None:
+        super().__delitem__(path_prefix)
+        self._rebuild()
+
+    def __ior__(  # type: ignore [override, misc]
+        self, other: Any
+    ) -> StructurePrefixMap:
+        self.update(other)
+        return self
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for path_prefix, activity in dict(*args, **kwargs).items():
+            self[path_prefix] = activity
+
+    def setdefault(self, path_prefix: str, activity: Activity) -> Activity:
+        if path_prefix not in self:
+            self[path_prefix] = activity
+        return self[path_prefix]
+
+    def pop(self, *args: Any) -> Any:
+        value = super().pop(*args)
+        self._rebuild()
+        return value
+
+    def popitem(self) -> tuple[str, Activity]:
+        item = super().popitem()
+        self._rebuild()
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self._trie = {}
+
+    def _rebuild(self) -> None:
+        items = dict(self)
+        self.clear()
+        self.update(items)
+
+    def match(self, path: str, allow_multiples: bool = False) -> list[Activity]:
+        """Get the structures whose path prefix contains a path.
+
+        Parameters
+        ----------
+        path
+            Absolute path to a file or directory.
+        allow_multiples
+            If true return all matching structures, otherwise only the
+            one with the longest prefix.
+
+        Returns
+        -------
+        list[Activity]
+            Names of the matching structures, longest prefix first.
+        """
+        node = self._trie
+        matches: list[Activity] = []
+        if _STRUCTURE_KEY in node:
+            matches.append(node[_STRUCTURE_KEY])
+        for part in path.split(os.sep):
+            if not part:
+                continue
+            child = node.get(part)
+            if child is None:
+                break
+            node = child
+            if _STRUCTURE_KEY in node:
+                matches.append(node[_STRUCTURE_KEY])
+        if allow_multiples:
+            return matches[::-1]
+        return matches[-1:]
+
+
+class _PartsLayout:
+    """Keys of the DRS components of a file, shared between all files with
+    the same keys."""
+
+    __slots__ = ("keys", "index")
+    _layouts: ClassVar[Dict[Tuple[str, ...], _PartsLayout]] = {}
+
+    def __init__(self, keys: Tuple[str, ...]) -> None:
+        self.keys = keys
+        self.index = {key: num for num, key in enumerate(keys)}
+
+    @classmethod
+    def get(cls, keys: Tuple[str, ...]) -> _PartsLayout:
+        """Get the shared layout of the given keys."""
+        try:
+            return cls._layouts[keys]
+        except KeyError:
+            keys = tuple(sys.intern(key) for key in keys)
+            return cls._layouts.setdefault(keys, cls(keys))
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _PartsView(MutableMapping[str, Any]):
+    """The DRS components of a file, changes are written to the file."""
+
+    __slots__ = ("_file",)
+
+    def __init__(self, drs_file: DRSFile) -> None:
+        self._file = drs_file
+
+    def __getitem__(self, key: str) -> Any:
+        return self._file._values[self._file._layout.index[key]]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        parts = dict(self)
+        parts[key] = value
+        self._file._set_parts(parts)
+
+    def __delitem__(self, key: str) -> None:
+        parts = dict(self)
+        del parts[key]
+        self._file._set_parts(parts)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._file._layout.keys)
+
+    def __len__(self) -> int:
+        return len(self._file._layout.keys)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def copy(self) -> Dict[str, Any]:
+        """A plain dictionary of the components."""
+        return dict(self)
+
+
+class _ComponentsView(MutableMapping[str, Any]):
+    """The root directory and DRS components of a file, changes are written
+    to the file."""
+
+    __slots__ = ("_file",)
+
+    _keys = ("root_dir", "parts")
+
+    def __init__(self, drs_file: DRSFile) -> None:
+        self._file = drs_file
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "root_dir":
+            return self._file._root_dir
+        if key == "parts":
+            return _PartsView(self._file)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "root_dir":
+            self._file._root_dir = sys.intern(value)
+            self._file._path = self._file._datasets = None
+        elif key == "parts":
+            self._file._set_parts(dict(value))
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError(f"The {key} of a DRS file can't be removed")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return repr({"root_dir": self["root_dir"], "parts": dict(self["parts"])})
+
+    def copy(self) -> Dict[str, Any]:
+        """A plain dictionary of the root directory and components."""
+        return {"root_dir": self["root_dir"], "parts": dict(self["parts"])}
+
+
 class DRSFile:
     """Represents a file that follows the
     `DRS standard <https://pcmdi.llnl.gov/mips/cmip5/docs/cmip5_data_reference_syntax.pdf>`_.
+
+    The DRS components of millions of files are held in memory, the files
+    are hence stored compactly: the component values are interned and
+    shared between files, the keys are shared between all files of the
+    same layout. The path and the datasets of a file are computed only
+    once.
     """
 
+    __slots__ = (
+        "_drs_structure",
+        "_structure",
+        "_root_dir",
+        "_layout",
+        "_values",
+        "_path",
+        "_datasets",
+    )
+    _drs_structure: Activity
+    _structure: Optional[DRSStructure]
+    _root_dir: str
+    _layout: _PartsLayout
+    _values: Tuple[Any, ...]
+    _path: Optional[str]
+    _datasets: Optional[Dict[Tuple[bool, bool], str]]
+
     # Lazy initialized in find_structure_from_path
-    DRS_STRUCTURE_PATH_TYPE: ClassVar[Optional[dict[str, Activity]]] = None
-    DRS_STRUCTURE: ClassVar[Optional[dict[Activity, DRSStructure]]] = None
+    DRS_STRUCTURE_PATH_TYPE: ClassVar[Optional[Dict[str, Activity]]] = None
+    DRS_STRUCTURE: ClassVar[Optional[Dict[Activity, DRSStructure]]] = None
 
     def __init__(
         self,
@@ -156,11 +446,88 @@ class DRSFile:
                 "parts": {},
             }
         self.dict = file_dict
-        # trim the last slash if present in root_dir
-        if self.dict["root_dir"]:
-            self.dict["root_dir"] = str(
-                Path(self.dict["root_dir"]).expanduser().absolute()
-            )
+
+    @classmethod
+    def _from_components(
+        cls,
+        structure: DRSStructure,
+        layout: _PartsLayout,
+        values: Tuple[Any, ...],
+        path: str,
+    ) -> DRSFile:
+        """Create a file from already normalised components."""
+        drs_file = cls.__new__(cls)
+        drs_file._drs_structure = structure.dataset
+        drs_file._structure = structure
+        drs_file._root_dir = structure.root_dir
+        drs_file._layout = layout
+        drs_file._values = values
+        drs_file._path = path
+        drs_file._datasets = None
+        return drs_file
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return (
+            self._drs_structure,
+            self._root_dir,
+            self._layout.keys,
+            self._values,
+            self._path,
+        )
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        drs_structure, root_dir, keys, values, path = state
+        self._drs_structure = drs_structure
+        self._structure = None
+        self._root_dir = root_dir
+        self._layout = _PartsLayout.get(keys)
+        self._values = tuple(_intern(v) for v in values)
+        self._path = path
+        self._datasets = None
+
+    @property
+    def drs_structure(self) -> Activity:
+        """Name of the DRS structure of this file."""
+        return self._drs_structure
+
+    @drs_structure.setter
+    def drs_structure(self, drs_structure: Activity) -> None:
+        self._drs_structure = drs_structure
+        self._structure = None
+        self._path = None
+        self._datasets = None
+
+    @property
+    def dict(self) -> FileComponents:
+        """The DRS components of this file.
+
+        The components are a view of the file, changing them or assigning
+        a new dictionary changes the file.
+        """
+        return cast(FileComponents, _ComponentsView(self))
+
+    @dict.setter
+    def dict(self, file_dict: FileComponents) -> None:
+        root_dir = file_dict["root_dir"]
+        if root_dir:
+            # trim the last slash if present in root_dir
+            root_dir = str(Path(root_dir).expanduser().absolute())
+        self._root_dir = sys.intern(root_dir)
+        self._set_parts(dict(file_dict["parts"]))
+
+    def _set_parts(self, parts: Dict[str, Any]) -> None:
+        """Replace the DRS components of the file."""
+        self._layout = _PartsLayout.get(tuple(parts))
+        self._values = tuple(
+            value if key == "file_name" else _intern(value)
+            for key, value in parts.items()
+        )
+        self._path = None
+        self._datasets = None
+
+    def _get(self, key: str, default: Any = None) -> Any:
+        num = self._layout.index.get(key)
+        return default if num is None else self._values[num]
 
     def __repr__(self) -> str:  # pragma: no cover
         """Get the JSON representation.
@@ -198,7 +565,12 @@ class DRSFile:
 
     def to_json(self) -> str:
         """:returns: (str) the json representation of the dictionary encapsulating the DRS components of this file."""
-        return json.dumps(self.dict)
+        return json.dumps(
+            {
+                "root_dir": self._root_dir,
+                "parts": dict(zip(self._layout.keys, self._values)),
+            }
+        )
 
     def to_path(self) -> str:
         """Return the path of the file.
@@ -217,13 +589,17 @@ class DRSFile:
             If it can't construct the path because information is missing
             in the DRS components.
         """
-        # TODO: check if construction is complete and therefore can succeed
-        result = self.dict["root_dir"]
+        if self._path is not None:
+            return self._path
+        index = self._layout.index
+        result = [self._root_dir]
         for key in self.get_drs_structure().parts_dir:
-            if key not in self.dict["parts"]:
+            if key not in index:
                 raise KeyError("Can't construct path as key %s is missing." % key)
-            result = os.path.join(result, self.dict["parts"][key])
-        return os.path.join(result, self.dict["parts"]["file_name"])
+            result.append(self._values[index[key]])
+        result.append(self._values[index["file_name"]])
+        self._path = os.path.join(*result)
+        return self._path
 
     def to_dataset(self, versioned: bool = False, to_path: bool = False) -> str:
         """Returns dataset information.
@@ -252,6 +628,10 @@ class DRSFile:
         ValueError
             If `versioned` is True but the structure is not versioned.
         """
+        if self._datasets is None:
+            self._datasets = {}
+        elif (versioned, to_path) in self._datasets:
+            return self._datasets[(versioned, to_path)]
         result = []
         structure = self.get_drs_structure()
         if versioned and self.versioned:
@@ -262,15 +642,18 @@ class DRSFile:
             iter_parts = structure.parts_dataset
         if to_path:
             iter_parts = structure.parts_dir
+        index = self._layout.index
         for key in iter_parts:
             if key in structure.defaults:
                 result.append(structure.defaults[key])
-            elif key in self.dict["parts"]:
-                result.append(self.dict["parts"][key])
+            elif key in index:
+                result.append(self._values[index[key]])
         if to_path:
-            return os.path.join(structure.root_dir, os.sep.join(result))
+            dataset = os.path.join(structure.root_dir, os.sep.join(result))
         else:
-            return ".".join(result)
+            dataset = ".".join(result)
+        self._datasets[(versioned, to_path)] = dataset
+        return dataset
 
     def to_dataset_path(self, versioned: bool = False) -> str:
         """Returns the path to the current dataset.
@@ -300,7 +683,7 @@ class DRSFile:
         bool
             True is the dataset is versioned, False otherwise
         """
-        return self.dict["parts"].get("version") is not None
+        return self._get("version") is not None
 
     @property
     def version(self) -> Optional[str]:
@@ -316,22 +699,27 @@ class DRSFile:
         Optional[str]
             The version of the dataset or None if not versioned
         """
-        return self.dict["parts"].get("version")
+        return self._get("version")
 
     @staticmethod
-    def _get_structure_prefix_map() -> dict[str, Activity]:
+    def _get_structure_prefix_map() -> StructurePrefixMap:
         """Returns reversed map of root_dir to Activity name.
 
         This will lazily initialize the map if it doesn't already exist.
 
         Returns
         -------
-        dict[str, Activity]
+        StructurePrefixMap
             Map of root_dir to Activity name
         """
 
         if DRSFile.DRS_STRUCTURE_PATH_TYPE is None:
             DRSFile._load_structure_definitions()
+        elif not isinstance(DRSFile.DRS_STRUCTURE_PATH_TYPE, StructurePrefixMap):
+            # a plain dict has been assigned
+            DRSFile.DRS_STRUCTURE_PATH_TYPE = StructurePrefixMap(
+                DRSFile.DRS_STRUCTURE_PATH_TYPE
+            )
         # ignored due to lazy initialization issue
         return DRSFile.DRS_STRUCTURE_PATH_TYPE  # type: ignore [return-value]
 
@@ -341,9 +729,9 @@ class DRSFile:
     ) -> list[Activity]:
         """Return all DRS structures that might be applicable.
 
-        This is resolved by checking if the prefix of any structure paths
-        matches that of the given file path. Parsing is not done, so it
-        might still fail. This just guarantees that only the structures
+        This is resolved by matching the path components of the given file
+        path against the prefix paths of the structures. Parsing is not done,
+        so it might still fail. This just guarantees that only the structures
         returned here *might* work.
 
         Parameters
@@ -351,8 +739,9 @@ class DRSFile:
         file_path
             Full path to a file, whose drs structure is being searched for.
         allow_multiples
-            If true returns a list with all possible structures, otherwise
-            returns the first match found.
+            If true returns a list with all possible structures, longest
+            prefix first, otherwise only the structure with the longest
+            matching prefix.
         Returns
         -------
         Union[Activity, List[Activity]]
@@ -363,20 +752,12 @@ class DRSFile:
         ValueError
             If `file_path` does not correspond with any DRS structure.
         """
-        structures = []
-        for (
-            path_prefix,
-            st_type,
-        ) in DRSFile._get_structure_prefix_map().items():
-            if file_path.startswith(path_prefix):
-                if allow_multiples:
-                    structures.append(st_type)
-                else:
-                    return [st_type]
+        structures = DRSFile._get_structure_prefix_map().match(
+            file_path, allow_multiples
+        )
         if not structures:
             raise ValueError(f"Unrecognized DRS structure in path {file_path}")
-        else:
-            return structures
+        return structures
 
     @staticmethod
     def find_structure_in_path(
@@ -391,8 +772,9 @@ class DRSFile:
         file_path
             Path to a directory which might contain DRS files.
         allow_multiples
-            If true returns a list with all possible structures, otherwise
-            returns the first match found.
+            If true returns a list with all possible structures, longest
+            prefix first, otherwise only the structure with the longest
+            matching prefix.
 
         Returns
         -------
@@ -404,20 +786,14 @@ class DRSFile:
         ValueError
             If `dir_path` does not correspond with any DRS structure.
         """
-        structures = []
-        for (
-            path_prefix,
-            st_type,
-        ) in DRSFile._get_structure_prefix_map().items():
-            if dir_path.startswith(path_prefix):
-                if allow_multiples:
-                    structures.append(st_type)
-                else:
-                    return st_type
+        structures = DRSFile._get_structure_prefix_map().match(
+            dir_path, allow_multiples
+        )
         if not structures:
             raise ValueError(f"No DRS structure found in {dir_path}.")
-        else:
+        if allow_multiples:
             return structures
+        return structures[0]
 
     @staticmethod
     def from_path(path: os.PathLike, activity: Optional[Activity] = None) -> DRSFile:
@@ -441,17 +817,155 @@ class DRSFile:
             If the given path cannot be used in the given DRS Structure
             or any configured structure if `activity` is None.
         """
-        path = Path(path).expanduser().absolute()
+        file_path = DRSFile._normalise_path(path)
         if activity is None:
-            activity = DRSFile.find_structure_from_path(str(path))[0]
+            activity = DRSFile.find_structure_from_path(file_path)[0]
         structure = DRSFile._get_drs_structure(activity)
+        return DRSFile._from_components(
+            structure,
+            structure.path_layout[0],
+            DRSFile._split_path(file_path, structure),
+            file_path,
+        )
 
-        try:
-            parts = path.parent.relative_to(structure.root_dir).parts
-        except ValueError as error:
-            raise ValueError(
-                f"File {path} does not correspond to {activity}"
-            ) from error
+    @staticmethod
+    def parse_many(
+        paths: Iterable[Union[str, os.PathLike]],
+        activity: Optional[Activity] = None,
+    ) -> DRSTable:
+        """Extract the DRS components of many paths at once.
+
+        The paths are grouped by their DRS structure and parsed group by
+        group into columns, which avoids creating a :class:`DRSFile` for
+        every path. Paths that can't be parsed don't raise an error but are
+        reported in the ``errors`` of the returned table.
+
+        Parameters
+        ----------
+        paths
+            Paths to files that are part of a DRS structure.
+        activity
+            Which structure is going to be used for all paths, by default
+            the structure of each path is looked up.
+
+        Returns
+        -------
+        DRSTable
+            The components of all parsed paths, in the order of the paths.
+        """
+        groups: Dict[Activity, List[Tuple[int, str]]] = {}
+        errors: Dict[str, str] = {}
+        match = DRSFile._get_structure_prefix_map().match
+        normalise = DRSFile._normalise_path
+        # files of the same directory share their structure
+        dir_structures: Dict[str, Optional[Activity]] = {}
+        num_paths = 0
+        for num_paths, path in enumerate(paths, 1):
+            path = normalise(path)
+            name = activity
+            if name is None:
+                directory = path[: path.rfind(os.sep)]
+                try:
+                    name = dir_structures[directory]
+                except KeyError:
+                    structures = match(directory)
+                    name = dir_structures[directory] = (
+                        structures[0] if structures else None
+                    )
+            if name is None:
+                errors[path] = f"Unrecognized DRS structure in path {path}"
+                continue
+            groups.setdefault(name, []).append((num_paths, path))
+        parsed: List[Tuple[DRSStructure, List[int], List[str], List[Any]]] = []
+        for name, group in groups.items():
+            try:
+                structure = DRSFile._get_drs_structure(name)
+            except ValueError as error:
+                errors.update((path, str(error)) for _, path in group)
+                continue
+            positions: List[int] = []
+            files: List[str] = []
+            rows: List[Tuple[Any, ...]] = []
+            root_dir = structure.root_dir.rstrip(os.sep) + os.sep
+            root_len = len(root_dir)
+            num_parts = len(structure.parts_dir) + 1
+            num_file_parts = len(structure.parts_file_name)
+            sources = structure.path_layout[1]
+            for num, path in group:
+                # split the path in place, paths that don't follow the
+                # structure straight away are left to _split_path
+                parts = path[root_len:].split(os.sep)
+                file_name = parts[-1]
+                suffix = file_name.rfind(".")
+                if 0 < suffix < len(file_name) - 1:
+                    file_name = file_name[:suffix]
+                file_name_parts = file_name.split("_")
+                if (
+                    path.startswith(root_dir)
+                    and len(parts) == num_parts
+                    and len(file_name_parts) == num_file_parts
+                ):
+                    parts.extend(file_name_parts)
+                    rows.append(tuple(map(parts.__getitem__, sources)))
+                else:
+                    try:
+                        rows.append(DRSFile._split_path(path, structure))
+                    except ValueError as error:
+                        errors[path] = str(error)
+                        continue
+                positions.append(num)
+                files.append(path)
+            parsed.append((structure, positions, files, rows))
+        row_numbers = {
+            num: row
+            for row, num in enumerate(sorted(n for _, p, _, _ in parsed for n in p))
+        }
+        num_rows = len(row_numbers)
+        columns: Dict[str, List[Optional[str]]] = {}
+        for structure, positions, files, rows in parsed:
+            group_rows = [row_numbers[num] for num in positions]
+            group_columns: Dict[str, Iterable[Any]] = {
+                key: values if key == "file_name" else map(_intern, values)
+                for key, values in zip(structure.path_layout[0].keys, zip(*rows))
+            }
+            for key, value in structure.defaults.items():
+                group_columns[key] = (value,) * len(rows)
+            group_columns["file"] = files
+            group_columns["dataset"] = (structure.dataset,) * len(rows)
+            for key, values in group_columns.items():
+                if len(parsed) == 1:
+                    columns[key] = list(values)
+                    continue
+                column = columns.setdefault(key, [None] * num_rows)
+                for row, value in zip(group_rows, values):
+                    column[row] = value
+        log.debug("Parsed %i of %i paths", num_rows, num_paths)
+        return DRSTable(columns=columns, errors=errors)
+
+    @staticmethod
+    def _normalise_path(path: Union[str, os.PathLike]) -> str:
+        """Make a path absolute, only touching paths that need it."""
+        path = os.fspath(path)
+        if not path.startswith(os.sep) or f"{os.sep}." in path or "//" in path:
+            return os.path.abspath(os.path.expanduser(path))
+        return path.rstrip(os.sep) or os.sep
+
+    @staticmethod
+    def _split_path(path: str, structure: DRSStructure) -> Tuple[Any, ...]:
+        """Split a normalised path into the values of the path layout of a
+        DRS structure.
+
+        Raises
+        ------
+        ValueError
+            If the path doesn't follow the DRS structure.
+        """
+        activity = structure.dataset
+        root_dir = structure.root_dir.rstrip(os.sep) + os.sep
+        if not path.startswith(root_dir):
+            raise ValueError(f"File {path} does not correspond to {activity}")
+        parts = path[len(root_dir) :].split(os.sep)
+        file_name = parts.pop()
 
         # check the number of parts
         if len(parts) != len(structure.parts_dir):
@@ -461,16 +975,13 @@ class DRSFile:
                     f"elements but got {len(parts)}. {path}"
                 )
             )
-
-        # first the dir
-        result: FileComponents = {
-            "root_dir": structure.root_dir,
-            "parts": dict(zip(structure.parts_dir, parts)),
-        }
-        result["parts"]["file_name"] = path.name
         # split file name
         # (extract .nc before splitting)
-        file_name_parts: list[str] = path.with_suffix("").name.split("_")
+        suffix = file_name.rfind(".")
+        if 0 < suffix < len(file_name) - 1:
+            file_name_parts = file_name[:suffix].split("_")
+        else:
+            file_name_parts = file_name.split("_")
         if (
             len(file_name_parts) == len(structure.parts_file_name) - 1
             and "fx" in file_name_parts
@@ -481,12 +992,12 @@ class DRSFile:
             raise ValueError(
                 f"File {path} does not follow the expected naming scheme for {activity}"
             )
-        for key, value in dict(zip(structure.parts_file_name, file_name_parts)).items():
-            result["parts"].setdefault(key, value)
-        return DRSFile(
-            result,
-            drs_structure=activity,
+        components = (
+            [sys.intern(part) for part in parts]
+            + [file_name]
+            + [sys.intern(part) for part in file_name_parts]
         )
+        return tuple(map(components.__getitem__, structure.path_layout[1]))
 
     def get_drs_structure(self) -> DRSStructure:
         """Returns the DRS structure used by this file.
@@ -495,7 +1006,9 @@ class DRSFile:
         -------
         DRSStructure
             The `DRS_STRUCTURE` used by this file."""
-        return DRSFile._get_drs_structure(self.drs_structure)
+        if self._structure is None:
+            self._structure = DRSFile._get_drs_structure(self._drs_structure)
+        return self._structure
 
     @staticmethod
     def _get_drs_structure(
@@ -614,9 +1127,11 @@ class DRSFile:
         """Loads DRSStructure definitions from the config.
 
         This handles the initialization of `DRS_STRUCTURE_PATH_TYPE` and
-        `DRS_STRUCTURE`.
+        `DRS_STRUCTURE`. The definitions are built from the process wide
+        cache of the DRS config, which is only read again if the config
+        file changed or the configuration has been reloaded.
         """
-        DRSFile.DRS_STRUCTURE_PATH_TYPE = {}
+        DRSFile.DRS_STRUCTURE_PATH_TYPE = StructurePrefixMap()
         DRSFile.DRS_STRUCTURE = {}
 
         conf = config.get_drs_config()
@@ -0,0 +1,206 @@
+"""Instrumentation of the solr ingestion pipeline.
+
+The crawl passes through several stages: walking the file system, parsing
+the DRS paths into solr documents, encoding the documents as json and
+posting them to solr. :class:`IngestStats` records the time spent in each
+stage together with counters of the crawled files and posted documents,
+which tells whether a slow crawl is bound by the file system, the parsing
+or the solr server.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from evaluation_system.misc import logger as log
+from evaluation_system.misc.utils import WalkStats
+
+T = TypeVar("T")
+
+STAGES: Tuple[str, ...] = ("walk", "parse", "encode", "post")
+"""The instrumented stages of the ingestion."""
+
+POST_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+"""Upper bounds in seconds of the POST latency histogram buckets."""
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+
+@dataclass
+class IngestStats:
+    """Timers and counters of an ingestion.
+
+    The statistics are updated from the crawling process, the posting
+    threads and, merged via :meth:`update`, from crawl worker processes.
+
+    Parameters
+    ----------
+    expected_files:
+        Number of files that are expected to be crawled, used to estimate
+        the remaining time of the crawl.
+    progress_interval:
+        Time in seconds between progress lines, None disables them.
+    """
+
+    expected_files: Optional[int] = None
+    progress_interval: Optional[float] = 60.0
+    walk: WalkStats = field(default_factory=WalkStats)
+    """Counters of the directory walk."""
+    parse_failures: int = 0
+    """Number of files whose path could not be parsed."""
+    docs_posted: Dict[str, int] = field(default_factory=dict)
+    """Number of documents that have been posted to each core."""
+    bytes_posted: int = 0
+    """Number of (uncompressed) json bytes that have been posted."""
+    posts: int = 0
+    """Number of POST requests."""
+    stage_time: Dict[str, float] = field(
+        default_factory=lambda: dict.fromkeys(STAGES, 0.0)
+    )
+    """Time in seconds spent in each stage. POST requests stream the
+    encoded documents, the ``post`` time hence includes the ``encode``
+    time of the posted documents."""
+    post_latency: List[int] = field(
+        default_factory=lambda: [0] * (len(POST_LATENCY_BUCKETS) + 1)
+    )
+    """Number of POST requests per latency bucket, the last bucket counts
+    requests slower than the largest bucket bound."""
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._last_report = self._start
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed(self) -> float:
+        """Time in seconds since the statistics were created."""
+        return time.monotonic() - self._start
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        """Add the time spent in a stage."""
+        with self._lock:
+            self.stage_time[stage] += seconds
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Measure the time spent in a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def timed(self, iterable: Iterable[T], stage: str) -> Iterator[T]:
+        """Yield from an iterable adding the time to get each item to a stage."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(stage, time.perf_counter() - start)
+                return
+            self.add_time(stage, time.perf_counter() - start)
+            yield item
+
+    def add_post(self, core: str, num_docs: int, latency: float) -> None:
+        """Record a POST request of documents to a core."""
+        with self._lock:
+            self.docs_posted[core] = self.docs_posted.get(core, 0) + num_docs
+            self.posts += 1
+            self.stage_time["post"] += latency
+            self.post_latency[bisect_left(POST_LATENCY_BUCKETS, latency)] += 1
+
+    def add_encoded(self, num_bytes: int, seconds: float) -> None:
+        """Record a block of json encoded documents."""
+        with self._lock:
+            self.bytes_posted += num_bytes
+            self.stage_time["encode"] += seconds
+
+    def update(self, other: IngestStats) -> None:
+        """Add the counters and timers of another ingestion."""
+        self.walk.update(other.walk)
+        with self._lock:
+            self.parse_failures += other.parse_failures
+            self.bytes_posted += other.bytes_posted
+            self.posts += other.posts
+            for core, num in other.docs_posted.items():
+                self.docs_posted[core] = self.docs_posted.get(core, 0) + num
+            for stage, seconds in other.stage_time.items():
+                self.stage_time[stage] = self.stage_time.get(stage, 0.0) + seconds
+            for num, count in enumerate(other.post_latency):
+                self.post_latency[num] += count
+
+    def progress(self) -> str:
+        """A line describing the progress and rates of the ingestion."""
+        elapsed = max(self.elapsed, 1e-9)
+        files = self.walk.files
+        docs = sum(self.docs_posted.values())
+        line = (
+            f"Crawled {files} files ({files / elapsed:.1f}/s), posted {docs} "
+            f"documents ({docs / elapsed:.1f}/s, "
+            f"{self.bytes_posted / elapsed / 2**20:.2f} MiB/s)"
+        )
+        if self.expected_files and files:
+            remaining = max(self.expected_files - files, 0) * elapsed / files
+            line += f", ETA {_format_duration(remaining)}"
+        return line
+
+    def report(self, force: bool = False) -> None:
+        """Log the progress if the progress interval has passed."""
+        if self.progress_interval is None and not force:
+            return
+        now = time.monotonic()
+        if force or now - self._last_report >= (self.progress_interval or 0):
+            self._last_report = now
+            log.info(self.progress())
+
+    def summary(self) -> Dict[str, Any]:
+        """A json serialisable summary of the statistics."""
+        elapsed = self.elapsed
+        with self._lock:
+            latency = {
+                str(bound): count
+                for bound, count in zip(POST_LATENCY_BUCKETS, self.post_latency)
+            }
+            latency["+Inf"] = self.post_latency[-1]
+            return {
+                **asdict(self.walk),
+                "parse_failures": self.parse_failures,
+                "docs_posted": dict(self.docs_posted),
+                "bytes_posted": self.bytes_posted,
+                "posts": self.posts,
+                "elapsed": round(elapsed, 3),
+                "files_per_second": round(self.walk.files / max(elapsed, 1e-9), 3),
+                "stage_time": {k: round(v, 3) for k, v in self.stage_time.items()},
+                "post_latency": latency,
+            }
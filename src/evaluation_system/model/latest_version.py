@@ -0,0 +1,196 @@
+"""Resolution of the latest dataset versions during a crawl.
+
+Only the files of the newest version of a dataset belong into the
+*latest* solr core. The newest version is only known once the whole
+crawl has finished, the candidates are therefore collected in an on-disk
+store and written to the latest core at the end of the crawl.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+_LATEST_DOCS = (
+    "SELECT docs.dataset, docs.version, docs.doc FROM docs JOIN versions "
+    "ON docs.dataset = versions.dataset AND docs.version = versions.version"
+)
+
+
+class LatestVersionResolver:
+    """Keep track of the newest version of every dataset of a crawl.
+
+    Documents are added together with their unversioned dataset id and
+    version. Documents of a version older than the newest version seen so
+    far are dropped right away, all others are kept in a temporary SQLite
+    database. Once all documents have been added :meth:`latest` yields the
+    documents that belong to the newest version of each dataset.
+
+    The newest versions of the most recently used datasets are cached in
+    memory, older entries are moved to the database. Since the files of a
+    dataset are crawled together the cache rarely misses and memory usage
+    stays bounded regardless of the number of datasets.
+
+    Parameters
+    ----------
+    db_file:
+        Path to the SQLite database, defaults to a temporary file that is
+        removed when the resolver is closed. An existing database is
+        reused, which allows for resuming a crawl after :meth:`sync`.
+    cache_size:
+        Number of datasets whose newest version is kept in memory.
+    batch_size:
+        Number of documents that are written to the database at once.
+    """
+
+    def __init__(
+        self,
+        db_file: Optional[os.PathLike] = None,
+        cache_size: int = 100_000,
+        batch_size: int = 10_000,
+    ) -> None:
+        self._tmp_dir: Optional[TemporaryDirectory] = None
+        if db_file is None:
+            self._tmp_dir = TemporaryDirectory(prefix="freva-latest-")
+            db_file = Path(self._tmp_dir.name) / "latest.sqlite"
+        self.cache_size = max(cache_size, 1)
+        self.batch_size = max(batch_size, 1)
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._pending: List[Tuple[str, str, str]] = []
+        self._con = sqlite3.connect(str(db_file))
+        if self._tmp_dir is not None:
+            # The database only lives for one crawl, durability is not needed.
+            self._con.execute("PRAGMA journal_mode=OFF")
+            self._con.execute("PRAGMA synchronous=OFF")
+        else:
+            self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS docs (dataset TEXT, version TEXT, doc TEXT)"
+        )
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS versions "
+            "(dataset TEXT PRIMARY KEY, version TEXT)"
+        )
+
+    def __enter__(self) -> LatestVersionResolver:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _get_version(self, dataset: str) -> Optional[str]:
+        if dataset in self._cache:
+            self._cache.move_to_end(dataset)
+            return self._cache[dataset]
+        row = self._con.execute(
+            "SELECT version FROM versions WHERE dataset = ?", (dataset,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._set_version(dataset, row[0], dirty=False)
+        return row[0]
+
+    def _set_version(self, dataset: str, version: str, dirty: bool = True) -> None:
+        self._cache[dataset] = version
+        self._cache.move_to_end(dataset)
+        if dirty:
+            self._dirty.add(dataset)
+        if len(self._cache) > self.cache_size:
+            evicted, evicted_version = self._cache.popitem(last=False)
+            if evicted in self._dirty:
+                self._dirty.discard(evicted)
+                self._con.execute(
+                    "INSERT OR REPLACE INTO versions VALUES (?, ?)",
+                    (evicted, evicted_version),
+                )
+
+    def _flush(self) -> None:
+        self._con.executemany("INSERT INTO docs VALUES (?, ?, ?)", self._pending)
+        self._pending = []
+
+    def add(self, dataset: str, version: str, doc: Dict[str, Any]) -> None:
+        """Add the document of a file of a versioned dataset.
+
+        Parameters
+        ----------
+        dataset:
+            The dataset id without version information.
+        version:
+            The version of the dataset the file belongs to.
+        doc:
+            The solr document of the file.
+        """
+        self._add(dataset, version, doc)
+
+    def _add(self, dataset: str, version: str, doc: Union[str, Dict[str, Any]]) -> None:
+        newest = self._get_version(dataset)
+        if newest is not None and version < newest:
+            return
+        if newest is None or version > newest:
+            self._set_version(dataset, version)
+        if not isinstance(doc, str):
+            doc = json.dumps(doc)
+        self._pending.append((dataset, version, doc))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+
+    def merge(self, db_file: os.PathLike) -> None:
+        """Add the newest versions of another, synced, resolver database."""
+        con = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+        try:
+            for dataset, version, doc in con.execute(_LATEST_DOCS):
+                self._add(dataset, version, doc)
+        finally:
+            con.close()
+
+    def sync(self) -> None:
+        """Write all added documents and versions to the database."""
+        self._flush()
+        self._con.executemany(
+            "INSERT OR REPLACE INTO versions VALUES (?, ?)",
+            ((dataset, self._cache[dataset]) for dataset in self._dirty),
+        )
+        self._dirty.clear()
+        self._con.commit()
+
+    def versions(self) -> Iterator[Tuple[str, str]]:
+        """Get the newest version of every dataset."""
+        self.sync()
+        self._cache.clear()
+        yield from self._con.execute("SELECT dataset, version FROM versions")
+
+    def discard(self, datasets: Iterable[str]) -> None:
+        """Drop all documents of the given datasets."""
+        self.sync()
+        self._cache.clear()
+        self._con.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS discarded (dataset TEXT PRIMARY KEY)"
+        )
+        self._con.executemany(
+            "INSERT OR IGNORE INTO discarded VALUES (?)", ((d,) for d in datasets)
+        )
+        for table in ("docs", "versions"):
+            self._con.execute(
+                f"DELETE FROM {table} WHERE dataset IN (SELECT dataset FROM discarded)"
+            )
+        self._con.execute("DELETE FROM discarded")
+        self._con.commit()
+
+    def latest(self) -> Iterator[Dict[str, Any]]:
+        """Get the documents of the newest version of every dataset."""
+        self.sync()
+        self._cache.clear()
+        for _, _, doc in self._con.execute(_LATEST_DOCS):
+            yield json.loads(doc)
+
+    def close(self) -> None:
+        """Close the database and remove temporary files."""
+        self._con.close()
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
@@ -0,0 +1,224 @@
+"""Client side cache of databrowser facet and count queries.
+
+Facet and count queries are repeated over and over with the same
+constraints, for example by notebooks or the parameter completion of
+:class:`evaluation_system.api.parameters.SolrField`. Their results are
+cached in memory for a limited time and, optionally, in an on-disk tier
+under the user cache directory that is shared by all processes of the
+user.
+
+Entries are keyed on the solr core and the normalised query. Ingestion
+invalidates the entries of a core once its changes have been hard
+committed and when the core is swapped or unloaded, see
+:func:`invalidate_query_cache`. Changes that solr commits later on its
+own, like soft commits or ``commitWithin``, are seen at the latest once
+the entries expire, as are the changes of other processes.
+
+The cache is configured with the ``solr.cache_ttl``, ``solr.cache_size``
+and ``solr.disk_cache`` options of the configuration file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple, TypeVar
+from urllib.parse import parse_qsl
+
+import appdirs
+
+from evaluation_system.misc import config
+from evaluation_system.misc import logger as log
+
+T = TypeVar("T")
+
+QueryKey = Tuple[Any, ...]
+"""Key of a cached query, starting with the url of the solr core."""
+
+CACHE_DIR = Path(appdirs.user_cache_dir()) / "freva" / "solr"
+"""Location of the on-disk tier of the query cache."""
+
+
+def query_key(
+    core_url: str, kind: str, query: str, facets: Optional[Tuple[str, ...]] = None
+) -> QueryKey:
+    """Create the cache key of a solr query.
+
+    Parameters
+    ----------
+    core_url:
+        Url of the queried solr core.
+    kind:
+        Kind of the query, for example ``facets`` or ``count``.
+    query:
+        The url encoded query parameters, the order of the parameters and
+        of the filter queries doesn't change the key.
+    facets:
+        The requested facets, None for all facets.
+    """
+    params = tuple(sorted(parse_qsl(query, keep_blank_values=True)))
+    return (core_url, kind, params, facets)
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+class QueryCache:
+    """A size bounded LRU cache whose entries expire after a TTL.
+
+    Parameters
+    ----------
+    ttl:
+        Time in seconds after which entries expire, 0 disables the cache.
+    maxsize:
+        Maximum number of entries held in memory, the least recently used
+        entries are dropped first.
+    cache_dir:
+        Directory of the on-disk tier, None keeps the entries in memory
+        only. Entries that are not in memory are looked up on disk, which
+        shares them between processes.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        maxsize: int = 256,
+        cache_dir: Optional[os.PathLike] = None,
+    ) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._entries: OrderedDict[QueryKey, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether results are cached at all."""
+        return self.ttl > 0 and self.maxsize > 0
+
+    def _path(self, key: QueryKey) -> Path:
+        # the entries of a core share a prefix so they can be removed together
+        assert self.cache_dir is not None
+        name = f"{_digest(key[0])[:16]}-{_digest(json.dumps(key[1:]))}.json"
+        return self.cache_dir / name
+
+    def _read(self, key: QueryKey) -> Optional[Tuple[float, Any]]:
+        try:
+            with self._path(key).open() as stream:
+                created, value = json.load(stream)
+        except (OSError, ValueError):
+            return None
+        return created, value
+
+    def _write(self, key: QueryKey, created: float, value: Any) -> None:
+        path = self._path(key)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w") as stream:
+                json.dump([created, value], stream)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as error:
+            log.debug("Could not write query cache entry %s: %s", path, error)
+            tmp_path.unlink(missing_ok=True)
+
+    def _store(self, key: QueryKey, created: float, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (created, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key: QueryKey) -> Optional[Any]:
+        """Get a cached result, None if there is no valid entry."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+        if self.cache_dir is not None:
+            entry = self._read(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._store(key, *entry)
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+        return None
+
+    def set(self, key: QueryKey, value: Any) -> None:
+        """Add a result to the cache."""
+        if not self.enabled:
+            return
+        created = time.time()
+        self._store(key, created, value)
+        if self.cache_dir is not None:
+            self._write(key, created, value)
+
+    def get_or_set(self, key: QueryKey, func: Callable[[], T]) -> T:
+        """Get a cached result or compute and cache it."""
+        value = self.get(key)
+        if value is None:
+            value = func()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, core_url: Optional[str] = None) -> None:
+        """Drop the entries of a solr core, or all entries if None."""
+        with self._lock:
+            if core_url is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == core_url]:
+                    del self._entries[key]
+        if self.cache_dir is None or not self.cache_dir.is_dir():
+            return
+        pattern = "*.json" if core_url is None else f"{_digest(core_url)[:16]}-*.json"
+        for path in self.cache_dir.glob(pattern):
+            path.unlink(missing_ok=True)
+
+
+_QUERY_CACHE: Optional[QueryCache] = None
+_QUERY_CACHE_LOCK = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """The process wide query cache, created from the configuration."""
+    global _QUERY_CACHE
+    with _QUERY_CACHE_LOCK:
+        if _QUERY_CACHE is None:
+            disk_cache = str(config.get(config.SOLR_DISK_CACHE, "false"))
+            _QUERY_CACHE = QueryCache(
+                ttl=float(config.get(config.SOLR_CACHE_TTL, 60)),
+                maxsize=int(config.get(config.SOLR_CACHE_SIZE, 256)),
+                cache_dir=CACHE_DIR if disk_cache.lower() == "true" else None,
+            )
+        return _QUERY_CACHE
+
+
+def invalidate_query_cache(core_url: Optional[str] = None) -> None:
+    """Drop the cached query results of a solr core, or of all cores.
+
+    Called once changes of a core have been hard committed and when a core
+    is swapped or unloaded.
+    """
+    get_query_cache().invalidate(core_url)
+
+
+def reset_query_cache() -> None:
+    """Discard the query cache, it's created again from the configuration."""
+    global _QUERY_CACHE
+    with _QUERY_CACHE_LOCK:
+        _QUERY_CACHE = None
@@ -0,0 +1,227 @@
+"""Blue/green re-index of the solr cores.
+
+A full re-index loads all data into shadow copies of the ``files`` and
+``latest`` cores while the live cores keep serving requests. Once the
+shadow cores are loaded and their document counts are verified they are
+swapped with the live cores, users hence never see a partially indexed
+databrowser.
+
+The configuration of the live cores is copied to the instance
+directories of the shadow cores, those directories have to be accessible
+from the machine running the re-index (see :meth:`SolrCore.clone`).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from evaluation_system.misc import logger as log
+from evaluation_system.model.file import DRSFile
+from evaluation_system.model.ingest_stats import IngestStats
+from evaluation_system.model.latest_version import LatestVersionResolver
+from evaluation_system.model.solr_core import IngestPipeline, ShardCrawler, SolrCore
+
+UPDATE_LOG_PATTERN = re.compile(r"<updateLog\b.*?(?:/>|</updateLog>)", re.DOTALL)
+"""The update log definition in solrconfig.xml."""
+
+
+def _default_input_dirs() -> List[Path]:
+    """The root directories of all DRS structures."""
+    return [Path(p) for p in DRSFile._get_structure_prefix_map()]
+
+
+def _outermost_dirs(input_dirs: Sequence[os.PathLike]) -> List[Path]:
+    """Existing directories that are not part of another directory."""
+    dirs = sorted({Path(d).expanduser().absolute() for d in input_dirs})
+    outermost: List[Path] = []
+    for directory in dirs:
+        if not directory.is_dir():
+            log.warning("Skipping %s, not a directory", directory)
+            continue
+        if not any(str(directory).startswith(f"{o}{os.sep}") for o in outermost):
+            outermost.append(directory)
+    return outermost
+
+
+def _set_update_log(instance_dir: Path, enabled: bool, conf: str) -> None:
+    """Remove or restore the update log of a core configuration."""
+    config_file = instance_dir / "conf" / conf
+    backup = config_file.with_name(conf + ".orig")
+    if enabled:
+        if backup.exists():
+            backup.replace(config_file)
+        return
+    content = config_file.read_text()
+    shutil.copy2(config_file, backup)
+    config_file.write_text(UPDATE_LOG_PATTERN.sub("", content))
+
+
+def _create_shadow(
+    live: SolrCore, suffix: str, disable_update_log: bool
+) -> Tuple[SolrCore, Dict[str, str]]:
+    """Create an empty core with the configuration of the live core."""
+    status = live.status()
+    shadow = SolrCore(
+        core=f"{live.core}_{suffix}",
+        host=live.host,
+        port=live.port,
+        timeout=live.timeout,
+    )
+    if shadow.status():
+        log.warning("Removing stale shadow core %s", shadow.core)
+        shadow.unload(delete_instance_dir=True)
+    live_dir = Path(live.instance_dir)
+    # alternate between two instance directories, the live core may have been
+    # swapped in by a previous re-index and use the shadow directory name
+    instance_dir = live_dir.with_name(f"{live.core}_{suffix}")
+    if instance_dir == live_dir:
+        instance_dir = live_dir.with_name(live.core)
+    shutil.rmtree(instance_dir, ignore_errors=True)
+    live.clone(instance_dir)
+    options = {
+        "config": status.get("config", "solrconfig.xml"),
+        "schema": status.get("schema", "schema.xml"),
+    }
+    if disable_update_log:
+        _set_update_log(instance_dir, False, options["config"])
+    shadow.create(instance_dir=str(instance_dir), data_dir="data", **options)
+    return shadow, options
+
+
+def reindex(
+    input_dirs: Optional[Sequence[os.PathLike]] = None,
+    drs_type: Optional[str] = None,
+    chunk_size: int = 10000,
+    suffix: Tuple[str, ...] = (".nc", ".grb", ".zarr", ".grib", ".nc4"),
+    core: Optional[str] = None,
+    abort_on_errors: bool = False,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    workers: int = 1,
+    max_in_flight: int = 2,
+    queue_size: int = 4,
+    compress: bool = False,
+    disable_update_log: bool = False,
+    min_ratio: float = 0.0,
+    keep_old: bool = False,
+    shadow_suffix: str = "reindex",
+) -> Dict[str, int]:
+    """Re-index all data into shadow cores and swap them with the live cores.
+
+    The shadow cores are bulk loaded without deleting any entries and
+    without committing until all data has been ingested. After a hard
+    commit the number of documents of the shadow cores is compared to the
+    number of ingested documents. Only if they match the shadow cores are
+    swapped with the live cores. If anything goes wrong the live cores
+    are left untouched and the shadow cores are kept for inspection.
+
+    Parameters
+    ----------
+    input_dirs:
+        Directories that are crawled, defaults to the root directories of
+        all DRS structures.
+    disable_update_log:
+        Disable the update log of the shadow cores while loading, the
+        update log is restored before the cores are swapped.
+    min_ratio:
+        Minimum ratio of the number of documents of the shadow and the
+        live ``files`` core, guards against swapping in an incomplete
+        index, for example if a file system was not mounted.
+    keep_old:
+        Keep the previous live cores under the shadow core names instead
+        of removing them after the swap.
+    shadow_suffix:
+        Suffix of the shadow core names.
+
+    See :meth:`SolrCore.load_fs` for all other parameters.
+
+    Returns
+    -------
+    dict:
+        Number of documents of the new ``files`` and ``latest`` cores.
+
+    Raises
+    ------
+    RuntimeError:
+        If the verification of the shadow cores fails.
+    """
+    live_files = SolrCore(core=core, host=host, port=port)
+    live_latest = SolrCore(core="latest", host=host, port=port)
+    dirs = _outermost_dirs(input_dirs or _default_input_dirs())
+    shadows = [
+        _create_shadow(live, shadow_suffix, disable_update_log)
+        for live in (live_files, live_latest)
+    ]
+    (shadow_files, _), (shadow_latest, _) = shadows
+    stats = IngestStats()
+    with ExitStack() as stack:
+        crawler: Optional[ShardCrawler] = None
+        if workers > 1:
+            # Fork the crawl workers before the pipeline starts its threads
+            crawler = stack.enter_context(ShardCrawler(workers))
+        resolver = stack.enter_context(LatestVersionResolver())
+        pipeline = stack.enter_context(
+            IngestPipeline(
+                max_in_flight,
+                queue_size,
+                {"commit": False, "compress": compress},
+                stats,
+            )
+        )
+        for input_dir in dirs:
+            log.info("Re-indexing %s", input_dir)
+            SolrCore._ingest(
+                SolrCore._get_metadata_from_path(
+                    input_dir,
+                    abort_on_errors,
+                    suffix,
+                    drs_type=drs_type,
+                    workers=workers,
+                    stats=stats,
+                    crawler=crawler,
+                ),
+                pipeline,
+                shadow_files,
+                shadow_latest,
+                chunk_size,
+                resolver=resolver,
+            )
+        SolrCore._submit_latest(resolver, pipeline, shadow_latest, chunk_size)
+    num_docs = pipeline.num_docs
+    counts: Dict[str, int] = {}
+    for shadow, options in shadows:
+        shadow.commit()
+        counts[shadow.core] = shadow.count()
+        if counts[shadow.core] != num_docs.get(shadow.core, 0):
+            raise RuntimeError(
+                f"Core {shadow.core} holds {counts[shadow.core]} documents, "
+                f"{num_docs.get(shadow.core, 0)} have been ingested"
+            )
+        if disable_update_log:
+            _set_update_log(Path(shadow.instance_dir), True, options["config"])
+            shadow.reload()
+    live_count = live_files.count()
+    if counts[shadow_files.core] < min_ratio * live_count:
+        raise RuntimeError(
+            f"Core {shadow_files.core} holds {counts[shadow_files.core]} "
+            f"documents, the live core {live_count}"
+        )
+    for live, (shadow, _) in zip((live_files, live_latest), shadows):
+        log.info("Swapping %s with %s", live.core, shadow.core)
+        live.swap(shadow.core)
+        if not keep_old:
+            shadow.unload(delete_instance_dir=True)
+    log.info(
+        "Re-indexed %s files in %s directories",
+        stats.walk.files,
+        stats.walk.dirs,
+    )
+    return {
+        "files": counts[shadow_files.core],
+        "latest": counts[shadow_latest.core],
+    }
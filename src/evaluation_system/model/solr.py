@@ -8,13 +8,127 @@ This package encapsulate access to a solr instance
 
 from __future__ import annotations
 
+import queue
+import threading
 import urllib
-from typing import List, NamedTuple, Union, cast
+from typing import (
+    Any,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from typing_extensions import Literal
 
 from evaluation_system.misc import logger, utils
-from evaluation_system.model.solr_core import SolrCore
+from evaluation_system.model.query_cache import get_query_cache, query_key
+from evaluation_system.model.solr_core import SolrCore, get_solr_core
+
+T = TypeVar("T")
+
+_DONE = object()
+"""Marks the end of the prefetched pages."""
+
+
+def _prefetch(pages: Iterator[T], buffer_size: int) -> Iterator[T]:
+    """Iterate over pages that are fetched ahead by a background thread.
+
+    Up to ``buffer_size`` pages are buffered while the consumer processes
+    the current page. Errors while fetching are raised in the consumer, the
+    thread stops once the consumer stops iterating.
+    """
+    buffer: queue.Queue[Tuple[Any, Optional[BaseException]]] = queue.Queue(
+        maxsize=buffer_size
+    )
+    stop = threading.Event()
+
+    def put(item: Any, error: Optional[BaseException] = None) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put((item, error), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def fetch() -> None:
+        try:
+            for page in pages:
+                if not put(page):
+                    return
+        except BaseException as error:
+            put(None, error)
+        else:
+            put(_DONE)
+
+    threading.Thread(target=fetch, name="solr-prefetch", daemon=True).start()
+    try:
+        while True:
+            page, error = buffer.get()
+            if error is not None:
+                raise error
+            if page is _DONE:
+                return
+            yield page
+    finally:
+        stop.set()
+
+
+class SearchResults(Iterator[str]):
+    """Iterator over the results of a databrowser search.
+
+    The total number of results is available via ``len()`` or
+    :attr:`total`, which fetches the first page of results if it hasn't
+    been fetched yet.
+    """
+
+    def __init__(self, pages: Iterator[Tuple[int, List[str]]]) -> None:
+        self._pages = pages
+        self._page: Iterator[str] = iter(())
+        self._total: Optional[int] = None
+
+    def _next_page(self) -> bool:
+        try:
+            self._total, page = next(self._pages)
+        except StopIteration:
+            if self._total is None:
+                self._total = 0
+            return False
+        self._page = iter(page)
+        return True
+
+    @property
+    def total(self) -> int:
+        """The total number of results of the search."""
+        if self._total is None:
+            self._next_page()
+        return cast(int, self._total)
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __iter__(self) -> SearchResults:
+        return self
+
+    def __next__(self) -> str:
+        while True:
+            try:
+                return next(self._page)
+            except StopIteration:
+                if not self._next_page():
+                    raise
+
+    def close(self) -> None:
+        """Stop fetching results."""
+        close = getattr(self._pages, "close", None)
+        if close is not None:
+            close()
+
 
 SolrResponse = NamedTuple(
     "SolrResponse",
@@ -30,6 +144,10 @@ SolrResponse = NamedTuple(
 class SolrFindFiles(object):
     """Encapsulate access to Solr like the find files command"""
 
+    unique_key: str = "file"
+    """The uniqueKey of the solr schema, searches are additionally sorted by
+    it to give the deep paging cursors a unique sort order."""
+
     def __init__(self, core=None, host=None, port=None, get_status=False):
         """Create the connection pointing to the proper solr url and core.
         The default values of these parameters are setup in evaluation_system.model.solr_core.SolrCore
@@ -40,7 +158,10 @@ class SolrFindFiles(object):
         :param port: port number of the machine where the solr core is to be found.
         :param get_status: if the core should be contacted in an attempt to get more metadata.
         """
-        self.solr = SolrCore(core, host=host, port=port, get_status=get_status)
+        if get_status:
+            self.solr = SolrCore(core, host=host, port=port, get_status=True)
+        else:
+            self.solr = get_solr_core(core, host=host, port=port)
 
     def __str__(self):  # pragma: no cover
         return "<SolrFindFiles %s>" % self.solr
@@ -79,14 +200,19 @@ class SolrFindFiles(object):
         **search_dict: Union[str, list[str]],
     ) -> str:
         partial_dict = search_dict.copy()
-        for key in ("start", "row"):
-            _ = partial_dict.pop("start", None)
+        for key in ("start", "rows", "cursorMark"):
+            _ = partial_dict.pop(key, None)
         for key, value in {
             "q": "*:*",
             "fl": f"{uniq_key}",
             "sort": f"{uniq_key} desc",
         }.items():
             partial_dict.setdefault(key, value)
+        sort = cast(str, partial_dict["sort"])
+        sort_fields = [field.split()[0] for field in sort.split(",") if field.strip()]
+        if self.unique_key not in sort_fields:
+            # cursors need a sort order that is unique for every document
+            partial_dict["sort"] = f"{sort}, {self.unique_key} asc"
         if "text" in partial_dict:
             partial_dict["q"] = partial_dict.pop("text")
         return self._to_solr_query(partial_dict)
@@ -111,7 +237,10 @@ class SolrFindFiles(object):
           NamedTuple of metadata on the search query results.
         """
         query = self._get_file_query_parameters(uniq_key=uniq_key, **search_dict)
-        anw = self.solr.get_json("select?facet=true&rows=0&%s" % query)["response"]
+        anw = get_query_cache().get_or_set(
+            query_key(self.solr.core_url, "count", query),
+            lambda: self.solr.get_json("select?rows=0&%s" % query)["response"],
+        )
         return SolrResponse(
             num_objects=anw["numFound"],
             start=anw["start"],
@@ -125,36 +254,73 @@ class SolrFindFiles(object):
         latest_version=False,
         uniq_key="file",
         rows=None,
+        prefetch=0,
         **partial_dict,
     ):
-        """This encapsulates the Solr call to get documents and returns an iterator providing the. The special
-        parameter _retrieve_metadata will affect the first value returned by the iterator.
+        """This encapsulates the Solr call to get documents and returns an iterator providing the results. The total
+        number of results is taken from the first page of results and is available via ``len()`` or the ``total``
+        attribute of the returned :class:`SearchResults`.
+
+        The results are paged with solr cursors, the cost of getting a page
+        doesn't grow with the number of pages that have already been read.
+        Cursors can't start at an offset, the results before ``start`` are
+        hence skipped while paging.
 
         :param batch_size: the amount of files to be buffered from Solr.
+        :param prefetch: the number of pages that are fetched ahead on a background thread while the current page is
+         consumed, 0 fetches the next page only once the current page has been consumed.
         :param latest_version: if the search should *try* to find the latest version from all contained here. Please note
          that we don't use this anymore. Instead we have 2 cores and this is defined directly in :class:`SolrFindFiles.search`.
          It was changed because it was slow and required too much memory.
-        known beforehand how many values are going to be returned, even before getting them all. To avoid this we might
-        implement a result set object. But that would break the find_files compatibility.
+        :returns: An iterator over the results.
         """
         offset = int(partial_dict.pop("start", "0"))
         query = self._get_file_query_parameters(uniq_key=uniq_key, **partial_dict)
-        metadata = self._retrieve_metadata(uniq_key=uniq_key, **partial_dict)
-        if rows:
-            results_to_visit = min(metadata.num_objects, rows)
-        else:
-            results_to_visit = metadata.num_objects
-        while results_to_visit > 0:
-            batch_size = min(batch_size, results_to_visit)
+        pages = self._iter_pages(query, uniq_key, batch_size, offset, rows)
+        if prefetch > 0:
+            pages = _prefetch(pages, prefetch)
+        return SearchResults(pages)
+
+    def _iter_pages(
+        self,
+        query: str,
+        uniq_key: str,
+        batch_size: int,
+        offset: int,
+        rows: Optional[int] = None,
+    ) -> Iterator[Tuple[int, List[str]]]:
+        """Get the unique keys of the search results page by page.
+
+        The number of results is taken from the first page and returned
+        together with every page.
+        """
+        cursor = "*"
+        # the number of results is unknown until the first page is fetched
+        total = results_to_visit = -1
+        num_rows = min(batch_size, rows + offset) if rows else batch_size
+        while results_to_visit != 0:
             answer = self.solr.get_json(
-                "select?start=%s&rows=%s&%s" % (offset, batch_size, query)
+                "select?rows=%s&%s&%s"
+                % (num_rows, urllib.parse.urlencode({"cursorMark": cursor}), query)
             )
-            offset = answer["response"]["start"]
+            if total < 0:
+                total = max(answer["response"]["numFound"] - offset, 0)
+                if rows:
+                    total = min(total, rows)
+                results_to_visit = total
             iter_answer = answer["response"]["docs"]
-            for item in iter_answer:
-                yield item[uniq_key]
-                results_to_visit -= 1
-            offset += batch_size
+            skip = min(offset, len(iter_answer))
+            offset -= skip
+            page = [
+                item[uniq_key] for item in iter_answer[skip : skip + results_to_visit]
+            ]
+            results_to_visit -= len(page)
+            yield total, page
+            if answer.get("nextCursorMark", cursor) == cursor:
+                # no more results
+                break
+            cursor = answer["nextCursorMark"]
+            num_rows = min(batch_size, results_to_visit + offset)
 
     @staticmethod
     def _add_time_query(
@@ -229,24 +395,47 @@ class SolrFindFiles(object):
             partial_dict.update({"q": "*:*"})
 
         query = self._to_solr_query(partial_dict)
-
+        # the order of the facets doesn't change the cache key
+        fields = None if facets is None else sorted(facets)
+        key = query_key(
+            self.solr.core_url,
+            "facets",
+            query,
+            None if fields is None else tuple(fields),
+        )
+        answer = get_query_cache().get_or_set(
+            key, lambda: self._get_facet_counts(query, fields)
+        )
+        # return the facets in the requested order, the cached lists must
+        # not be changed by the callers
+        order = {field: num for num, field in enumerate(facets or [])}
+        return {
+            field: list(answer[field])
+            for field in sorted(answer, key=lambda f: order.get(f, len(order)))
+        }
+
+    def _get_facet_counts(self, query: str, facets: Optional[List[str]]) -> dict:
+        """Query the value counts of facets, all facets if None."""
         if facets is None:
             # get all minus what we don't want
-            facets = self.solr.get_solr_fields() - set(
-                [
-                    "",
-                    "_version_",
-                    "file_no_version",
-                    "level",
-                    "timestamp",
-                    "time",
-                    "creation_time",
-                    "source",
-                    "version",
-                    "uri",
-                    "file",
-                    "file_name",
-                ]
+            facets = sorted(
+                self.solr.get_solr_fields()
+                - set(
+                    [
+                        "",
+                        "_version_",
+                        "file_no_version",
+                        "level",
+                        "timestamp",
+                        "time",
+                        "creation_time",
+                        "source",
+                        "version",
+                        "uri",
+                        "file",
+                        "file_name",
+                    ]
+                )
             )
 
         if facets:
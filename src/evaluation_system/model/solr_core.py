@@ -14,18 +14,221 @@ We define two cores::
 from __future__ import annotations
 
 import json
+import multiprocessing as mp
+import multiprocessing.pool
+import multiprocessing.queues
 import os
+import pickle
+import queue
 import shutil
-import urllib
-import urllib.request
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import ExitStack
 from datetime import datetime
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterator, Optional, Tuple
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from typing_extensions import Literal
+from urllib3.util.retry import Retry
 
 from evaluation_system.misc import config
 from evaluation_system.misc import logger as log
-from evaluation_system.misc.utils import get_solr_time_range
-from evaluation_system.model.file import DRSFile
+from evaluation_system.misc.utils import (
+    ZARR_MARKERS,
+    WalkStats,
+    get_solr_time_range,
+    is_zarr_store,
+    read_inventory,
+    scan_dir,
+)
+from evaluation_system.model.crawl_manifest import (
+    CrawlCheckpoint,
+    CrawlManifest,
+    FileSignature,
+    file_signature,
+)
+from evaluation_system.model.file import DRSFile, DRSStructure
+from evaluation_system.model.ingest_stats import IngestStats
+from evaluation_system.model.latest_version import LatestVersionResolver
+from evaluation_system.model.query_cache import invalidate_query_cache
+
+Timeout = Union[float, Tuple[float, float]]
+"""Timeout of a request, either in total or as (connect, read) timeout."""
+
+CommitStrategy = Literal["chunk", "within", "soft"]
+"""How changes are committed while ingesting data.
+
+* ``chunk``: hard commit every posted chunk.
+* ``within``: let solr commit within a given time after each chunk.
+* ``soft``: soft commit every posted chunk.
+
+All strategies except ``chunk`` issue a single hard commit at the end
+of the ingestion.
+"""
+
+_SESSIONS: Dict[Tuple[int, str, str], requests.Session] = {}
+_SESSION_LOCK = threading.Lock()
+_CORES: Dict[Tuple[int, str, str, str], SolrCore] = {}
+_CORE_LOCK = threading.Lock()
+_METADATA: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+_METADATA_LOCK = threading.Lock()
+
+
+def iter_json_body(
+    docs: Union[Dict[str, Any], Iterable[Dict[str, Any]]],
+    compress: bool = False,
+    buffer_size: int = 64 * 1024,
+    stats: Optional[IngestStats] = None,
+) -> Iterator[bytes]:
+    """Encode documents as a json request body piece by piece.
+
+    The documents are serialised one at a time and written in blocks of
+    about ``buffer_size`` bytes, hence the memory needed does not grow with
+    the number of documents.
+
+    Parameters
+    ----------
+    docs:
+        A single json object or an iterable of documents that is encoded
+        as json array.
+    compress:
+        Gzip compress the encoded body.
+    buffer_size:
+        Size of the blocks that are yielded.
+    stats:
+        Record the encoding time and the size of the encoded documents.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    start = time.perf_counter()
+
+    def _encode(pieces: List[str]) -> bytes:
+        data = "".join(pieces).encode("ascii")
+        if stats is not None:
+            stats.add_encoded(len(data), time.perf_counter() - start)
+        return compressor.compress(data) if compressor else data
+
+    if isinstance(docs, dict):
+        pieces = [json.dumps(docs)]
+    else:
+        pieces, size = ["["], 1
+        for num, doc in enumerate(docs):
+            piece = ("," if num else "") + json.dumps(doc)
+            pieces.append(piece)
+            size += len(piece)
+            if size >= buffer_size:
+                block = _encode(pieces)
+                if block:
+                    yield block
+                pieces, size = [], 0
+                start = time.perf_counter()
+        pieces.append("]")
+    block = _encode(pieces)
+    if compressor:
+        block += compressor.flush()
+    yield block
+
+
+def get_http_session(
+    host: str,
+    port: Union[str, int],
+    retries: Optional[int] = None,
+    pool_size: int = 16,
+) -> requests.Session:
+    """Get the keep-alive connection pool for a Solr host.
+
+    One session is kept per process and Solr host, all cores of the host
+    share it. Idempotent requests (GET) that fail because of connection
+    problems or with a 429/5xx status are retried with exponential backoff,
+    POST requests are only retried if the connection could not be
+    established. Gzip compressed responses are decoded transparently.
+
+    Parameters
+    ----------
+    host:
+        Hostname of the Solr server.
+    port:
+        Port of the Solr server.
+    retries:
+        Maximum number of retries, defaults to the ``solr.retries``
+        configuration or 3.
+    pool_size:
+        Maximum number of connections kept alive, this should be at least
+        the number of threads using the session concurrently.
+    """
+    key = (os.getpid(), str(host), str(port))
+    with _SESSION_LOCK:
+        if key not in _SESSIONS:
+            if retries is None:
+                retries = int(config.get(config.SOLR_RETRIES, 3))
+            retry = Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+            )
+            session = requests.Session()
+            session.headers["Accept-Encoding"] = "gzip"
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSIONS[key] = session
+        return _SESSIONS[key]
+
+
+def get_solr_core(
+    core: Optional[str] = None,
+    host: Optional[str] = None,
+    port: Optional[Union[str, int]] = None,
+) -> SolrCore:
+    """Get the shared client of a Solr core.
+
+    One :class:`SolrCore` is kept per process and core, creating it doesn't
+    contact the Solr server. The schema fields and the status of the cores
+    are cached for ``solr.metadata_ttl`` seconds, see
+    :meth:`SolrCore.get_solr_fields` and :meth:`SolrCore.status`.
+
+    Parameters
+    ----------
+    core:
+        Name of the core, defaults to the ``solr.core`` configuration.
+    host:
+        Hostname of the Solr server, defaults to the ``solr.host``
+        configuration.
+    port:
+        Port of the Solr server, defaults to the ``solr.port``
+        configuration.
+    """
+    host = host or config.get(config.SOLR_HOST)
+    port = port or config.get(config.SOLR_PORT)
+    core = core or config.get(config.SOLR_CORE)
+    key = (os.getpid(), str(host), str(port), str(core))
+    with _CORE_LOCK:
+        if key not in _CORES:
+            _CORES[key] = SolrCore(core, host=host, port=port, get_status=False)
+        return _CORES[key]
 
 
 class SolrCore:
@@ -39,6 +242,7 @@ class SolrCore:
         instance_dir=None,
         data_dir=None,
         get_status=True,
+        timeout: Optional[Timeout] = None,
     ):
         """Create the connection pointing to the proper solr url and core.
 
@@ -47,7 +251,9 @@ class SolrCore:
         :param port: The port number of the Solr Server (default: loaded from config file)
         :param instance_dir: the core instance directory (if empty but the core exists it will get downloaded from Solr)
         :param data_dir: the directory where the data is being kept (if empty but the core exists it will
-        get downloaded from Solr)"""
+        get downloaded from Solr)
+        :param timeout: the timeout of requests in seconds, either in total or as (connect, read) tuple
+        (default: loaded from config file or 20)"""
 
         self.host = host or config.get(config.SOLR_HOST)
         self.port = port or config.get(config.SOLR_PORT)
@@ -56,9 +262,11 @@ class SolrCore:
         self.core_url = self.solr_url + self.core + "/"
         self.instance_dir = instance_dir
         self.data_dir = data_dir
+        self.timeout = timeout or float(config.get(config.SOLR_TIMEOUT, 20))
+        self.session = get_http_session(self.host, self.port)
 
         if get_status:
-            st = self.status()
+            st = self.status(cached=True)
         else:
             st = {}
         if self.instance_dir is None and "instanceDir" in st:
@@ -68,33 +276,56 @@ class SolrCore:
         else:
             self.data_dir = "data"
 
-        # Other Defaults
-        import socket
-
-        socket.setdefaulttimeout(20)
-
     def __str__(self):
         return "<SolrCore %s>" % self.core_url
 
-    def post(self, list_of_dicts, auto_list=True, commit=True):
+    def post(
+        self,
+        list_of_dicts,
+        auto_list=True,
+        commit=True,
+        soft_commit=False,
+        commit_within: Optional[int] = None,
+        compress: bool = False,
+        stats: Optional[IngestStats] = None,
+    ):
         """Sends some json to Solr for ingestion.
 
+        Lists or iterators of documents are encoded incrementally and streamed to
+        Solr using chunked transfer encoding.
+
         :param list_of_dicts: either a json or more normally a list of json instances that will be sent to Solr for ingestion
         :param auto_list: avoid packing list_of dicts in a directory if it's not one
         :param commit: send also a Solr commit so that changes can be seen immediately.
+        :param soft_commit: send a Solr soft commit, changes become visible without flushing them to disk.
+        :param commit_within: let Solr commit the changes within this many milliseconds.
+        :param compress: gzip compress the request body, the Solr server must accept gzip encoded requests.
+        :param stats: record the json encoding time and the size of the request body.
         """
-        if auto_list and not isinstance(list_of_dicts, list):
+        if auto_list and isinstance(list_of_dicts, dict):
             list_of_dicts = [list_of_dicts]
-        endpoint = "update/json?"
+        params = []
         if commit:
-            endpoint += "commit=true"
-        query = self.core_url + endpoint
+            params.append("commit=true")
+        if soft_commit:
+            params.append("softCommit=true")
+        if commit_within is not None:
+            params.append(f"commitWithin={commit_within}")
+        query = self.core_url + "update/json?" + "&".join(params)
         log.debug(query)
-        post_data = json.dumps(list_of_dicts).encode("ascii")
-        req = urllib.request.Request(query, post_data)
-        req.add_header("Content-type", "application/json")
-
-        return urllib.request.urlopen(req).read()
+        headers = {"Content-type": "application/json"}
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+        response = self.session.post(
+            query,
+            data=iter_json_body(list_of_dicts, compress=compress, stats=stats),
+            headers=headers,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        if commit:
+            invalidate_query_cache(self.core_url)
+        return response.content
 
     def get_json(self, endpoint, use_core=True, check_response=True):
         """Return some json from server. Is the raw access to Solr.
@@ -114,9 +345,10 @@ class SolrCore:
             query = self.solr_url + endpoint
         log.debug(query)
         try:
-            req = urllib.request.Request(query)
-            response = json.loads(urllib.request.urlopen(req).read())
-        except urllib.error.HTTPError as error:
+            req = self.session.get(query, timeout=self.timeout)
+            req.raise_for_status()
+            response = req.json()
+        except requests.exceptions.HTTPError as error:
             raise ValueError("Bad databrowser request: %s", error)
         if response["responseHeader"]["status"] != 0:
             raise ValueError(
@@ -125,12 +357,45 @@ class SolrCore:
 
         return response
 
-    def get_solr_fields(self) -> set[str]:
+    def _core_metadata(self, name: str, fetch: Callable[[], Any], cached: bool) -> Any:
+        """Get metadata of the core that is shared by all clients of the process.
+
+        :param name: the name of the metadata.
+        :param fetch: get the metadata from the server.
+        :param cached: return the metadata if it was fetched less than ``solr.metadata_ttl`` seconds ago.
+        """
+        key = (self.core_url, name)
+        now = time.monotonic()
+        if cached:
+            ttl = float(config.get(config.SOLR_METADATA_TTL, 300))
+            with _METADATA_LOCK:
+                entry = _METADATA.get(key)
+            if entry is not None and now - entry[0] < ttl:
+                return entry[1]
+        value = fetch()
+        with _METADATA_LOCK:
+            _METADATA[key] = (now, value)
+        return value
+
+    def _forget_metadata(self, core_url: Optional[str] = None) -> None:
+        """Drop the cached metadata of this or another core."""
+        core_url = core_url or self.core_url
+        with _METADATA_LOCK:
+            for key in [k for k in _METADATA if k[0] == core_url]:
+                del _METADATA[key]
+
+    def get_solr_fields(self, cached: bool = True) -> set[str]:
         """Return information about the Solr fields. This is dynamically generated and because of
         dynamicFiled entries in the Schema, this information cannot be inferred from anywhere else.
+
+        :param cached: use the fields of the last ``solr.metadata_ttl`` seconds instead of requesting the schema.
         """
-        answer = self.get_json("schema")["schema"]["fields"]
-        return set([f["name"] for f in answer if f["type"] != "extra_facet"])
+
+        def fetch() -> frozenset[str]:
+            answer = self.get_json("schema")["schema"]["fields"]
+            return frozenset([f["name"] for f in answer if f["type"] != "extra_facet"])
+
+        return set(self._core_metadata("fields", fetch, cached))
 
     def create(
         self,
@@ -162,7 +427,7 @@ class SolrCore:
         if data_dir is not None:
             self.data_dir = data_dir
 
-        return self.get_json(
+        response = self.get_json(
             "admin/cores?action=CREATE&name=%s" % self.core
             + "&instanceDir=%s" % self.instance_dir
             + "&config=%s" % config
@@ -170,44 +435,63 @@ class SolrCore:
             + "&dataDir=%s" % self.data_dir,
             use_core=False,
         )
+        self._forget_metadata()
+        return response
 
     def reload(self):
         """Reload the core. Useful after schema changes.
         Be aware that you might need to re-ingest everything if there were changes to the indexing part of the schema.
         """
-        return self.get_json(
+        response = self.get_json(
             "admin/cores?action=RELOAD&core=" + self.core, use_core=False
         )
+        self._forget_metadata()
+        return response
 
-    def unload(self):
-        """Unload the core."""
-        return self.get_json(
-            "admin/cores?action=UNLOAD&core=" + self.core, use_core=False
-        )
+    def unload(self, delete_instance_dir: bool = False):
+        """Unload the core.
+
+        :param delete_instance_dir: also remove the instance directory, including the index data.
+        """
+        url_str = "admin/cores?action=UNLOAD&core=" + self.core
+        if delete_instance_dir:
+            url_str += "&deleteInstanceDir=true"
+        response = self.get_json(url_str, use_core=False)
+        self._forget_metadata()
+        invalidate_query_cache(self.core_url)
+        return response
 
     def swap(self, other_core):
         """Will swap this core with the given one (that means rename their references)
 
         :param other_core: the name of the other core that this will be swapped with.
         """
-        return self.get_json(
+        response = self.get_json(
             "admin/cores?action=SWAP&core=%s&other=%s" % (self.core, other_core),
             use_core=False,
         )
+        for core_url in (self.core_url, f"{self.solr_url}{other_core}/"):
+            self._forget_metadata(core_url)
+            invalidate_query_cache(core_url)
+        return response
 
-    def status(self, general=False):
+    def status(self, general=False, cached=False):
         """Return status information about this core or the whole Solr server.
 
         :param general: If True return all information as provided by the server, otherwise just the status info
-        from this core."""
+        from this core.
+        :param cached: use the status of this core of the last ``solr.metadata_ttl`` seconds if possible.
+        """
         url_str = "admin/cores?action=STATUS"
-        if not general:
-            url_str += "&core=" + self.core
-        response = self.get_json(url_str, use_core=False)
         if general:
-            return response
-        else:
-            return response["status"][self.core]
+            return self.get_json(url_str, use_core=False)
+        url_str += "&core=" + self.core
+        status = self._core_metadata(
+            "status",
+            lambda: self.get_json(url_str, use_core=False)["status"][self.core],
+            cached,
+        )
+        return dict(status)
 
     def clone(self, new_instance_dir, data_dir="data", copy_data=False):
         """Copies a core somewhere else.
@@ -230,9 +514,96 @@ class SolrCore:
                 os.path.join(new_instance_dir, data_dir),
             )
 
-    def delete(self, query):
-        """Issue a delete command, there's no default query for this to avoid unintentional deletion."""
-        self.post(dict(delete=dict(query=query)), auto_list=False)
+    def count(self, query: str = "*:*") -> int:
+        """Return the number of documents matching the query.
+
+        :param query: the solr query, all documents by default."""
+        response = self.get_json("select?" + urlencode({"q": query, "rows": 0}))
+        return int(response["response"]["numFound"])
+
+    def delete(self, query, **commit_kwargs):
+        """Issue a delete command, there's no default query for this to avoid unintentional deletion.
+
+        :param commit_kwargs: commit parameters passed to :meth:`post`, a hard commit by default.
+        """
+        self.post(dict(delete=dict(query=query)), auto_list=False, **commit_kwargs)
+
+    def delete_ids(
+        self, ids: Iterable[str], chunk_size: int = 10_000, **commit_kwargs: Any
+    ) -> int:
+        """Delete the documents with the given unique keys.
+
+        The ids are sent in chunks of ``chunk_size`` ids without committing,
+        a single commit is sent once all ids have been deleted.
+
+        :param ids: the unique keys, i.e. the file paths, of the documents.
+        :param chunk_size: number of ids that are sent with one request.
+        :param commit_kwargs: commit parameters like in :meth:`post`, a hard commit by default.
+        :return: the number of ids that have been sent.
+        """
+        post_kwargs = {**commit_kwargs, "commit": False, "soft_commit": False}
+        ids, num = iter(ids), 0
+        while True:
+            chunk = list(islice(ids, max(chunk_size, 1)))
+            if not chunk:
+                break
+            self.post({"delete": chunk}, auto_list=False, **post_kwargs)
+            num += len(chunk)
+        if num and commit_kwargs.get("commit", True):
+            self.commit()
+        elif num and commit_kwargs.get("soft_commit", False):
+            self.commit(soft=True)
+        return num
+
+    def commit(self, soft: bool = False) -> None:
+        """Commit all pending changes of the core.
+
+        :param soft: only make the changes visible without flushing them to disk."""
+        command = {"commit": {}} if not soft else {"commit": {"softCommit": True}}
+        self.post(command, auto_list=False, commit=False)
+        if not soft:
+            invalidate_query_cache(self.core_url)
+
+    @staticmethod
+    def _commit_kwargs(
+        commit: CommitStrategy, commit_within: int = 60_000
+    ) -> Dict[str, Any]:
+        """Translate a commit strategy to the parameters of :meth:`post`."""
+        if commit == "chunk":
+            return {"commit": True}
+        if commit == "soft":
+            return {"commit": False, "soft_commit": True}
+        if commit == "within":
+            return {"commit": False, "commit_within": commit_within}
+        raise ValueError(f"Unknown commit strategy: {commit}")
+
+    @staticmethod
+    def _get_metadata(
+        file: Path,
+        abort_on_errors: bool,
+        drs_type: Optional[str] = None,
+        stat: Optional[os.stat_result] = None,
+        stats: Optional[IngestStats] = None,
+    ) -> Optional[Tuple[DRSFile, Dict[str, str]]]:
+        """Create the solr metadata of a single file, None if not parsable."""
+        start = time.perf_counter()
+        timestamp = (stat or file.stat()).st_mtime
+        try:
+            drs_file = DRSFile.from_path(file, activity=drs_type)
+        except (ValueError, FileNotFoundError) as e:
+            if stats is not None:
+                stats.parse_failures += 1
+            if abort_on_errors:
+                raise e
+            log.error(e.__str__())
+            return None
+        metadata = SolrCore.to_solr_dict(drs_file)
+        metadata["timestamp"] = timestamp
+        metadata["time"] = get_solr_time_range(metadata.pop("time", ""))
+        metadata["uri"] = metadata["file"]
+        if stats is not None:
+            stats.add_time("parse", time.perf_counter() - start)
+        return drs_file, metadata
 
     @staticmethod
     def _get_metadata_from_path(
@@ -240,35 +611,106 @@ class SolrCore:
         abort_on_errors: bool,
         allowed_suffixes: Tuple[str, ...],
         drs_type: Optional[str] = None,
+        workers: int = 1,
+        manifest: Optional[CrawlManifest] = None,
+        stats: Optional[IngestStats] = None,
+        resume_after: Optional[str] = None,
+        crawler: Optional[ShardCrawler] = None,
     ) -> Iterator[Tuple[DRSFile, Dict[str, str]]]:
+        """Crawl a directory and create the solr metadata of all files.
+
+        If a ``manifest`` is given, all crawled files are recorded in it
+        and only files that are new or have changed are yielded. Files
+        that are crawled before ``resume_after`` are skipped. With more
+        than one worker the directory is crawled by ``crawler``, which is
+        created if it's not given.
+        """
+        stats = stats or IngestStats(progress_interval=None)
+        iterator: Iterable[Tuple[Path, os.stat_result]]
         if in_dir.is_file():
-            iterator = [in_dir]
+            iterator = []
+            if in_dir.suffix in allowed_suffixes:
+                stats.walk.files += 1
+                iterator = [(in_dir, in_dir.stat())]
+            else:
+                stats.walk.skipped_suffix += 1
+        elif workers > 1 and not is_zarr_store(in_dir):
+            yield from _get_metadata_parallel(
+                in_dir,
+                abort_on_errors,
+                allowed_suffixes,
+                drs_type,
+                workers,
+                manifest,
+                stats,
+                resume_after=resume_after,
+                crawler=crawler,
+            )
+            return
         else:
-            iterator = dir_iter(in_dir)
-        for file in iterator:
-            if file.suffix not in allowed_suffixes:
+            iterator = scan_dir(
+                in_dir,
+                suffixes=allowed_suffixes,
+                stats=stats.walk,
+                resume_after=resume_after,
+            )
+        for file, stat in stats.timed(iterator, "walk"):
+            if manifest is not None and not manifest.record(file_signature(file, stat)):
                 continue
-            timestamp = file.stat().st_mtime
-            try:
-                drs_file = DRSFile.from_path(file, activity=drs_type)
-            except (ValueError, FileNotFoundError) as e:
-                if abort_on_errors:
-                    raise e
-                log.error(e.__str__())
+            result = SolrCore._get_metadata(
+                file, abort_on_errors, drs_type, stat=stat, stats=stats
+            )
+            if result is not None:
+                yield result
+
+    @staticmethod
+    def _get_metadata_from_inventory(
+        inventory: Iterable[Tuple[Path, Optional[os.stat_result]]],
+        abort_on_errors: bool,
+        allowed_suffixes: Tuple[str, ...],
+        drs_type: Optional[str] = None,
+        stats: Optional[IngestStats] = None,
+    ) -> Iterator[Tuple[DRSFile, Dict[str, str]]]:
+        """Create the solr metadata of all files of an inventory.
+
+        Files without a stat result in the inventory are stat'ed.
+        """
+        stats = stats or IngestStats(progress_interval=None)
+        for file, stat in stats.timed(inventory, "walk"):
+            file = Path(file).expanduser().absolute()
+            if file.suffix not in allowed_suffixes:
+                stats.walk.skipped_suffix += 1
                 continue
-            metadata = SolrCore.to_solr_dict(drs_file)
-            metadata["timestamp"] = timestamp
-            metadata["time"] = get_solr_time_range(metadata.pop("time", ""))
-            metadata["uri"] = metadata["file"]
-            yield drs_file, metadata
+            stats.walk.files += 1
+            if stat is None:
+                try:
+                    stat = file.stat()
+                except OSError as error:
+                    if abort_on_errors:
+                        raise error
+                    log.error(error.__str__())
+                    continue
+            result = SolrCore._get_metadata(
+                file, abort_on_errors, drs_type, stat=stat, stats=stats
+            )
+            if result is not None:
+                yield result
+
+    def _del_files(
+        self, files: Iterable[str], chunk_size: int = 10_000, **commit_kwargs: Any
+    ) -> int:
+        """Delete the entries of the given files."""
+        return self.delete_ids(map(str, files), chunk_size, **commit_kwargs)
 
-    def _del_file_pattern(self, file_pattern: Path, prefix: str = "file") -> None:
+    def _del_file_pattern(
+        self, file_pattern: Path, prefix: str = "file", **commit_kwargs: Any
+    ) -> None:
         """Delete all entries of the core."""
         file_pattern = Path(file_pattern).expanduser().absolute()
         # TODO: Better way to determine if we have a regex on board
         if file_pattern.is_dir():
             file_pattern /= "*"
-        self.delete(f"{prefix}:\\{file_pattern}")
+        self.delete(f"{prefix}:\\{file_pattern}", **commit_kwargs)
 
     @staticmethod
     def delete_entries(
@@ -292,11 +734,58 @@ class SolrCore:
             The prefix representing the data store, currently only posix file
             types are supported (file)
         """
-        core_latest = SolrCore(core="latest", host=host, port=port)
-        core_all_files = SolrCore(core=None, host=host, port=port)
+        core_latest = get_solr_core(core="latest", host=host, port=port)
+        core_all_files = get_solr_core(core=None, host=host, port=port)
         core_all_files._del_file_pattern(file_pattern)
         core_latest._del_file_pattern(file_pattern)
 
+    @staticmethod
+    def delete_files(
+        files: Iterable[os.PathLike],
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        chunk_size: int = 10_000,
+        core_latest: Optional[SolrCore] = None,
+        core_all_files: Optional[SolrCore] = None,
+    ) -> int:
+        """Delete the entries of the given files from the solr server.
+
+        Instead of a delete query per file the paths are sent as lists of ids
+        in large chunks and both cores are committed once at the end.
+
+        Parameters:
+        ----------
+        files:
+            The paths of the files that are deleted.
+        host:
+            The server hostname of the apache solr server.
+        port:
+            The host port number the apache solr server is listing to.
+        chunk_size:
+            Number of files that are deleted with one request.
+
+        Returns
+        -------
+        int: The number of deleted files.
+        """
+        cores = (
+            core_all_files or get_solr_core(core=None, host=host, port=port),
+            core_latest or get_solr_core(core="latest", host=host, port=port),
+        )
+        paths = (str(Path(f).expanduser().absolute()) for f in files)
+        num = 0
+        while True:
+            chunk = list(islice(paths, max(chunk_size, 1)))
+            if not chunk:
+                break
+            for core in cores:
+                core.delete_ids(chunk, chunk_size, commit=False)
+            num += len(chunk)
+        if num:
+            for core in cores:
+                core.commit()
+        return num
+
     @staticmethod
     def load_fs(
         input_dir: Path,
@@ -309,7 +798,21 @@ class SolrCore:
         abort_on_errors: bool = False,
         host: Optional[str] = None,
         port: Optional[int] = None,
-    ) -> None:
+        workers: int = 1,
+        max_in_flight: int = 2,
+        queue_size: int = 4,
+        incremental: bool = False,
+        manifest_file: Optional[os.PathLike] = None,
+        commit: CommitStrategy = "chunk",
+        commit_within: int = 60_000,
+        compress: bool = False,
+        resume: bool = False,
+        checkpoint_interval: Optional[float] = 60.0,
+        checkpoint_dir: Optional[os.PathLike] = None,
+        progress_interval: Optional[float] = 60.0,
+        expected_files: Optional[int] = None,
+        stats: Optional[IngestStats] = None,
+    ) -> Dict[str, Any]:
         """Load information of files on posix file system into Solr.
 
         This method loads the information from a file and decides if it should be added
@@ -338,56 +841,409 @@ class SolrCore:
         host:
             The server hostname of the apache solr server.
         port:
-            The host port number the apache solr server is listing to."""
-        core_latest = core_latest or SolrCore(core="latest", host=host, port=port)
-        core_all_files = core_all_files or SolrCore(core=core, host=host, port=port)
-        core_latest._del_file_pattern(input_dir)
-        core_all_files._del_file_pattern(input_dir)
-        chunk, chunk_latest = [], []
-        chunk_count = 0
-        chunk_latest_new: Dict[str, Dict[str, str]] = {}
-        latest_versions: Dict[str, str] = {}
-        for drs_file, metadata in SolrCore._get_metadata_from_path(
-            input_dir, abort_on_errors, suffix, drs_type=drs_type
-        ):
-            chunk.append(metadata)
-            if drs_file.versioned:
-                # TODO: We need a proper data set versioning.
-                version = latest_versions.get(
-                    drs_file.to_dataset(versioned=False), "-1"
+            The host port number the apache solr server is listing to.
+        workers:
+            Number of processes used to crawl the directory tree. With more
+            than one worker the tree is split into sub directories that are
+            crawled and parsed in parallel, the ingested metadata is the
+            same as for a serial crawl.
+        max_in_flight:
+            Maximum number of concurrent POST requests to the solr cores,
+            crawling continues while the chunks are being indexed.
+        queue_size:
+            Number of chunks that can wait for being posted before
+            the crawl is paused.
+        incremental:
+            Only ingest files that have been added or changed since the last
+            crawl of ``input_dir`` and delete the entries of files that have
+            vanished, instead of re-ingesting everything. The state of the
+            crawled files and the dataset versions held by the latest core
+            are kept in a crawl manifest, entries of versions that are
+            superseded by a new version are deleted from the latest core.
+        manifest_file:
+            Location of the crawl manifest used for incremental crawls,
+            defaults to a file next to the user configuration.
+        commit:
+            The commit strategy while ingesting: ``chunk``, the default,
+            hard commits every chunk, ``within`` lets solr commit within
+            ``commit_within`` milliseconds and ``soft`` soft commits every
+            chunk. Except for ``chunk`` a single hard commit is sent once all
+            data has been ingested.
+        commit_within:
+            Maximum time in milliseconds until ingested data is committed,
+            if the ``within`` strategy is used.
+        compress:
+            Gzip compress the documents sent to solr, the solr server must
+            accept gzip encoded requests.
+        resume:
+            Resume an interrupted crawl of ``input_dir`` from its last
+            checkpoint. Files and directories that have already been
+            ingested are skipped and existing entries are not deleted.
+            If there is no checkpoint the crawl starts from scratch.
+        checkpoint_interval:
+            Time in seconds between saving checkpoints of the crawl,
+            None disables checkpoints.
+        checkpoint_dir:
+            Location of the crawl checkpoints, defaults to a directory
+            next to the user configuration.
+        progress_interval:
+            Time in seconds between logging the progress and rates of the
+            crawl, None disables progress lines.
+        expected_files:
+            Number of files that are expected to be crawled, used to
+            estimate the remaining time of the crawl.
+        stats:
+            Collect the statistics of the crawl in this object, for example
+            to combine the statistics of several crawls.
+
+        Returns
+        -------
+        dict:
+            Summary of the crawl statistics, see :meth:`IngestStats.summary`."""
+        if resume and incremental:
+            raise ValueError("Incremental crawls can't be resumed.")
+        commit_kwargs = SolrCore._commit_kwargs(commit, commit_within)
+        core_latest = core_latest or get_solr_core(core="latest", host=host, port=port)
+        core_all_files = core_all_files or get_solr_core(
+            core=core, host=host, port=port
+        )
+        input_dir = Path(input_dir).expanduser().absolute()
+        stats = stats or IngestStats(expected_files, progress_interval)
+        checkpoint: Optional[CrawlCheckpoint] = None
+        resume_after: Optional[str] = None
+        if checkpoint_interval is not None and input_dir.is_dir():
+            checkpoint = CrawlCheckpoint(input_dir, checkpoint_dir)
+            if (
+                resume
+                and checkpoint.last_file
+                and checkpoint.last_file.startswith(f"{input_dir}{os.sep}")
+            ):
+                resume_after = checkpoint.last_file
+                log.info("Resuming crawl after %s", resume_after)
+            else:
+                checkpoint.remove()
+        with ExitStack() as stack:
+            manifest: Optional[CrawlManifest] = None
+            if incremental:
+                manifest = stack.enter_context(CrawlManifest(manifest_file))
+                manifest.start(input_dir)
+            crawler: Optional[ShardCrawler] = None
+            if workers > 1:
+                # The worker processes have to be forked before the
+                # threads of the pipeline are started.
+                crawler = stack.enter_context(ShardCrawler(workers, manifest))
+            resolver: Optional[LatestVersionResolver] = None
+            superseded: List[str] = []
+            if manifest is not None:
+                resolver = stack.enter_context(LatestVersionResolver())
+            if resume_after is None and (
+                manifest is None or not manifest.has_entries(input_dir)
+            ):
+                core_latest._del_file_pattern(input_dir, **commit_kwargs)
+                core_all_files._del_file_pattern(input_dir, **commit_kwargs)
+            with IngestPipeline(
+                max_in_flight,
+                queue_size,
+                {**commit_kwargs, "compress": compress},
+                stats=stats,
+            ) as pipeline:
+                SolrCore._ingest(
+                    SolrCore._get_metadata_from_path(
+                        input_dir,
+                        abort_on_errors,
+                        suffix,
+                        drs_type=drs_type,
+                        workers=workers,
+                        manifest=manifest,
+                        stats=stats,
+                        resume_after=resume_after,
+                        crawler=crawler,
+                    ),
+                    pipeline,
+                    core_all_files,
+                    core_latest,
+                    chunk_size,
+                    checkpoint=checkpoint,
+                    checkpoint_interval=checkpoint_interval or 0,
+                    resolver=resolver,
+                    manifest=manifest,
                 )
-                idx = drs_file.to_dataset(versioned=False)
-                if (drs_file.version or "0") > version:
-                    # unknown or new version, update
+                if resolver is not None and manifest is not None:
+                    superseded = SolrCore._resolve_latest(resolver, manifest)
+                    SolrCore._submit_latest(resolver, pipeline, core_latest, chunk_size)
+            if superseded:
+                log.info("Deleting %s superseded latest entries", len(superseded))
+                core_latest._del_files(superseded, **commit_kwargs)
+            if manifest is not None:
+                vanished = list(manifest.vanished(input_dir))
+                if vanished:
+                    log.info("Deleting %s vanished entries", len(vanished))
+                    core_all_files._del_files(vanished, **commit_kwargs)
+                    core_latest._del_files(vanished, **commit_kwargs)
+                    SolrCore._restore_latest(
+                        manifest.remove(vanished),
+                        manifest,
+                        core_latest,
+                        abort_on_errors,
+                        drs_type,
+                        **commit_kwargs,
+                    )
+            if commit != "chunk":
+                core_all_files.commit()
+                core_latest.commit()
+            if manifest is not None:
+                manifest.commit()
+        if checkpoint is not None:
+            checkpoint.remove()
+        log.info(
+            "Crawled %s files in %s directories, skipped %s duplicated links, "
+            "saved %s metadata calls",
+            stats.walk.files,
+            stats.walk.dirs,
+            stats.walk.duplicates,
+            stats.walk.stat_calls_saved,
+        )
+        stats.report(force=True)
+        return stats.summary()
+
+    @staticmethod
+    def load_inventory(
+        inventory: Union[
+            os.PathLike, IO[bytes], Iterable[Tuple[Path, Optional[os.stat_result]]]
+        ],
+        drs_type: Optional[str] = None,
+        chunk_size: int = 10000,
+        suffix: Tuple[str, ...] = (".nc", ".grb", ".zarr", ".grib", ".nc4"),
+        core: Optional[str] = None,
+        core_latest: Optional[SolrCore] = None,
+        core_all_files: Optional[SolrCore] = None,
+        abort_on_errors: bool = False,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        max_in_flight: int = 2,
+        queue_size: int = 4,
+        commit: CommitStrategy = "chunk",
+        commit_within: int = 60_000,
+        compress: bool = False,
+        separator: Optional[bytes] = None,
+        progress_interval: Optional[float] = 60.0,
+        expected_files: Optional[int] = None,
+        stats: Optional[IngestStats] = None,
+    ) -> Dict[str, Any]:
+        """Load information of files listed in an inventory into Solr.
+
+        Instead of crawling a directory the files are read from a
+        precomputed file list, see :func:`read_inventory` for the format.
+        The files are parsed and ingested like in :meth:`load_fs`, existing
+        entries are not deleted.
+
+        Parameters:
+        -----------
+        inventory:
+            Path to the inventory file, a binary stream of the inventory
+            (e.g. ``sys.stdin.buffer``) or the already read inventory
+            entries.
+        separator:
+            Record separator of the inventory, NUL or new line separated
+            records are detected if None.
+
+        See :meth:`load_fs` for all other parameters.
+
+        Returns
+        -------
+        dict:
+            Summary of the ingestion statistics, see :meth:`IngestStats.summary`."""
+        commit_kwargs = SolrCore._commit_kwargs(commit, commit_within)
+        core_latest = core_latest or get_solr_core(core="latest", host=host, port=port)
+        core_all_files = core_all_files or get_solr_core(
+            core=core, host=host, port=port
+        )
+        if isinstance(inventory, (str, os.PathLike)):
+            inventory = read_inventory(inventory, separator=separator)
+        elif hasattr(inventory, "read"):
+            inventory = read_inventory(cast(IO[bytes], inventory), separator=separator)
+        stats = stats or IngestStats(expected_files, progress_interval)
+        with IngestPipeline(
+            max_in_flight,
+            queue_size,
+            {**commit_kwargs, "compress": compress},
+            stats=stats,
+        ) as pipeline:
+            SolrCore._ingest(
+                SolrCore._get_metadata_from_inventory(
+                    inventory, abort_on_errors, suffix, drs_type=drs_type, stats=stats
+                ),
+                pipeline,
+                core_all_files,
+                core_latest,
+                chunk_size,
+            )
+        if commit != "chunk":
+            core_all_files.commit()
+            core_latest.commit()
+        stats.report(force=True)
+        return stats.summary()
+
+    @staticmethod
+    def _ingest(
+        metadata_iter: Iterator[Tuple[DRSFile, Dict[str, str]]],
+        pipeline: IngestPipeline,
+        core_all_files: SolrCore,
+        core_latest: SolrCore,
+        chunk_size: int,
+        checkpoint: Optional[CrawlCheckpoint] = None,
+        checkpoint_interval: float = 60.0,
+        resolver: Optional[LatestVersionResolver] = None,
+        manifest: Optional[CrawlManifest] = None,
+    ) -> None:
+        """Split the crawled metadata into chunks and hand them to the pipeline.
+
+        All files are sent to the ``core_all_files`` core while crawling. Files
+        of versioned datasets are only sent to the ``core_latest`` core once
+        the crawl has finished and the newest version of every dataset is known.
+        If a ``resolver`` is given the files of versioned datasets are only
+        added to it, the caller has to send the latest versions. The dataset
+        and version of these files are recorded in the ``manifest``, if given.
+
+        If a ``checkpoint`` is given, the last file of the chunks that have
+        been posted is saved every ``checkpoint_interval`` seconds together
+        with the state of the latest version resolution.
+        """
+        chunk: List[Dict[str, str]] = []
+        chunk_latest: List[Dict[str, str]] = []
+        chunk_count = 0
+        # sequence number of the last chunk submitted for a file
+        markers: List[Tuple[int, str]] = []
+        last_save = time.monotonic()
+        resolver_db = None
+        if checkpoint is not None:
+            checkpoint.path.mkdir(exist_ok=True, parents=True)
+            resolver_db = checkpoint.resolver_db
+        with ExitStack() as stack:
+            submit_latest = resolver is None
+            if resolver is None:
+                resolver = stack.enter_context(LatestVersionResolver(resolver_db))
+            for drs_file, metadata in metadata_iter:
+                pipeline.stats.report()
+                chunk.append(metadata)
+                if drs_file.versioned:
+                    dataset = drs_file.to_dataset(versioned=False)
                     version = drs_file.version or "0"
-                    latest_versions[idx] = version
-                    chunk_latest_new[idx] = metadata
-                if (drs_file.version or "0") >= version:
+                    resolver.add(dataset, version, metadata)
+                    if manifest is not None:
+                        manifest.set_dataset(metadata["file"], dataset, version)
+                else:
+                    # if not version always add to latest
                     chunk_latest.append(metadata)
-            else:
-                # if not version always add to latest
-                chunk_latest_new[drs_file.to_dataset(versioned=False)] = metadata
-                chunk_latest.append(metadata)
-            if len(chunk) >= chunk_size:
-                log.info(
-                    "Sending entries %s-%s"
-                    % (
-                        chunk_count * chunk_size,
-                        (chunk_count + 1) * chunk_size,
+                if len(chunk) >= chunk_size:
+                    log.info(
+                        "Sending entries %s-%s"
+                        % (
+                            chunk_count * chunk_size,
+                            (chunk_count + 1) * chunk_size,
+                        )
                     )
+                    seq = pipeline.submit(core_all_files, chunk)
+                    if chunk_latest:
+                        seq = pipeline.submit(core_latest, chunk_latest)
+                    markers.append((seq, metadata["file"]))
+                    chunk, chunk_latest = [], []
+                    chunk_count += 1
+                if (
+                    checkpoint is not None
+                    and markers
+                    and time.monotonic() - last_save >= checkpoint_interval
+                ):
+                    completed = pipeline.completed
+                    posted = [m for m in markers if m[0] <= completed]
+                    if posted:
+                        resolver.sync()
+                        checkpoint.save(posted[-1][1])
+                        markers = markers[len(posted) :]
+                    last_save = time.monotonic()
+            # flush
+            if len(chunk) > 0:
+                log.info("Sending last %s entries" % (len(chunk)))
+                pipeline.submit(core_all_files, chunk)
+            if submit_latest:
+                SolrCore._submit_latest(
+                    resolver, pipeline, core_latest, chunk_size, chunk_latest
                 )
-                core_all_files.post(chunk)
-                chunk = []
-                chunk_count += 1
+            else:
                 if chunk_latest:
-                    core_latest.post(chunk_latest)
-                    chunk_latest, chunk_latest_new = [], {}
-        # flush
-        if len(chunk) > 0:
-            log.info("Sending last %s entries" % (len(chunk)))
-            core_all_files.post(chunk)
-            if chunk_latest:
-                core_latest.post(chunk_latest)
+                    pipeline.submit(core_latest, chunk_latest)
+                resolver.sync()
+
+    @staticmethod
+    def _submit_latest(
+        resolver: LatestVersionResolver,
+        pipeline: IngestPipeline,
+        core_latest: SolrCore,
+        chunk_size: int,
+        chunk_latest: Optional[List[Dict[str, str]]] = None,
+    ) -> None:
+        """Hand the newest versions of all datasets to the pipeline."""
+        chunk_latest = chunk_latest or []
+        for metadata in resolver.latest():
+            chunk_latest.append(metadata)
+            if len(chunk_latest) >= chunk_size:
+                pipeline.submit(core_latest, chunk_latest)
+                chunk_latest = []
+        if chunk_latest:
+            pipeline.submit(core_latest, chunk_latest)
+
+    @staticmethod
+    def _resolve_latest(
+        resolver: LatestVersionResolver, manifest: CrawlManifest
+    ) -> List[str]:
+        """Compare the newest versions of an incremental crawl with the latest core.
+
+        Only changed files are crawled incrementally, the newest version of a
+        dataset that has been crawled is therefore compared with the version
+        held by the latest core. Datasets whose crawled files belong to an older
+        version are dropped from the ``resolver``.
+
+        Returns
+        -------
+        list:
+            The files of versions that are superseded by a newer version.
+        """
+        outdated: List[str] = []
+        superseded: List[str] = []
+        for dataset, version in resolver.versions():
+            current = manifest.latest_version(dataset)
+            if current is not None and version < current:
+                outdated.append(dataset)
+                continue
+            if current is not None and version > current:
+                superseded += manifest.older_files(dataset, version)
+            manifest.set_latest(dataset, version)
+        resolver.discard(outdated)
+        return superseded
+
+    @staticmethod
+    def _restore_latest(
+        datasets: Iterable[str],
+        manifest: CrawlManifest,
+        core_latest: SolrCore,
+        abort_on_errors: bool,
+        drs_type: Optional[str] = None,
+        **commit_kwargs: Any,
+    ) -> None:
+        """Add the newest remaining version of datasets to the latest core.
+
+        This is used for datasets whose latest version has vanished.
+        """
+        docs: List[Dict[str, str]] = []
+        for dataset in datasets:
+            version, files = manifest.newest_files(dataset)
+            manifest.set_latest(dataset, version)
+            for file in files:
+                result = SolrCore._get_metadata(Path(file), abort_on_errors, drs_type)
+                if result is not None:
+                    docs.append(result[1])
+        if docs:
+            core_latest.post(docs, **commit_kwargs)
 
     @staticmethod
     def to_solr_dict(drs_file):
@@ -406,10 +1262,468 @@ class SolrCore:
         return metadata
 
 
-def dir_iter(start_dir, abort_on_error=True, followlinks=True):
-    for base_dir, dirs, files in os.walk(start_dir, followlinks=followlinks):
-        # make sure we walk them in the proper order (latest version first)
-        dirs.sort(reverse=True)
-        files.sort(reverse=True)  # just for consistency
-        for f in files:
-            yield Path(base_dir) / f
+class IngestPipeline:
+    """Post documents to solr cores while the crawl continues.
+
+    The crawl (producer) puts chunks of documents into a bounded queue
+    that is processed by a pool of threads (consumers) each sending one
+    POST request at a time. If all threads are busy and the queue is
+    full the producer blocks until a chunk has been posted. Errors of
+    the consumers are re-raised in the producer.
+
+    Chunks might be posted in a different order than they were submitted.
+    This is safe as long as the chunks do not hold different documents
+    with the same unique key. Each chunk gets a sequence number,
+    :attr:`completed` tells up to which chunk everything has been posted.
+
+    Parameters
+    ----------
+    max_in_flight:
+        Maximum number of concurrent POST requests.
+    queue_size:
+        Maximum number of chunks waiting to be posted.
+    post_kwargs:
+        Additional keyword arguments for :meth:`SolrCore.post`, such as the
+        commit parameters.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 2,
+        queue_size: int = 4,
+        post_kwargs: Optional[Dict[str, Any]] = None,
+        stats: Optional[IngestStats] = None,
+    ) -> None:
+        self._post_kwargs = post_kwargs or {}
+        if stats is not None:
+            self._post_kwargs = {**self._post_kwargs, "stats": stats}
+        self.stats = stats or IngestStats(progress_interval=None)
+        self._queue: queue.Queue[
+            Optional[Tuple[int, SolrCore, List[Dict[str, str]]]]
+        ] = queue.Queue(maxsize=max(queue_size, 1))
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._posted: Set[int] = set()
+        self._threads = [
+            threading.Thread(target=self._consume, daemon=True)
+            for _ in range(max(max_in_flight, 1))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self) -> IngestPipeline:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _consume(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None:
+                    seq, core, docs = item
+                    start = time.perf_counter()
+                    core.post(docs, **self._post_kwargs)
+                    self.stats.add_post(
+                        core.core, len(docs), time.perf_counter() - start
+                    )
+                    with self._lock:
+                        self._posted.add(seq)
+                        while self._completed + 1 in self._posted:
+                            self._completed += 1
+                            self._posted.discard(self._completed)
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _check_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    @property
+    def completed(self) -> int:
+        """Sequence number up to which all chunks have been posted."""
+        with self._lock:
+            return self._completed
+
+    @property
+    def num_docs(self) -> Dict[str, int]:
+        """Number of documents that have been posted to each core."""
+        return dict(self.stats.docs_posted)
+
+    def submit(self, core: SolrCore, docs: List[Dict[str, str]]) -> int:
+        """Add a chunk of documents for the given core to the queue.
+
+        This blocks if the queue is full.
+
+        Returns
+        -------
+        int:
+            The sequence number of the chunk.
+        """
+        self._check_error()
+        self._submitted += 1
+        self._queue.put((self._submitted, core, docs))
+        return self._submitted
+
+    def close(self) -> None:
+        """Wait for all pending chunks to be posted and stop the threads."""
+        if not self._threads:
+            return
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._check_error()
+
+
+def dir_iter(start_dir, abort_on_error=True, followlinks=True, recursive=True):
+    for file, _ in scan_dir(start_dir, followlinks=followlinks, recursive=recursive):
+        yield file
+
+
+CrawlShard = Tuple[str, bool]
+"""A unit of crawl work: a directory and whether it should be walked recursively."""
+
+
+def split_crawl_dir(
+    start_dir: Path, num_shards: int, max_depth: int = 8
+) -> List[CrawlShard]:
+    """Split a directory tree into sub trees that can be crawled independently.
+
+    Directories are expanded level by level until at least ``num_shards``
+    units of work exist. An expanded directory contributes one
+    non-recursive shard for the files it contains directly, followed by
+    one shard per sub directory. The shards are kept in the same order
+    as :func:`dir_iter` would visit the files, hence concatenating the
+    results of all shards yields the same sequence as a serial walk.
+
+    Parameters
+    ----------
+    start_dir:
+        The root directory of the crawl.
+    num_shards:
+        The minimum number of shards that should be created, if possible.
+    max_depth:
+        Do not expand directories deeper than this level.
+
+    Returns
+    -------
+    list[tuple[str, bool]]:
+        The directories and whether they should be walked recursively.
+    """
+    shards: List[CrawlShard] = [(str(start_dir), True)]
+    start_stat = os.stat(start_dir)
+    visited_dirs = {(start_stat.st_dev, start_stat.st_ino)}
+    for _ in range(max_depth):
+        if len(shards) >= num_shards:
+            break
+        expanded: List[CrawlShard] = []
+        for path, recursive in shards:
+            if not recursive:
+                expanded.append((path, recursive))
+                continue
+            sub_dirs = []
+            try:
+                entries = sorted(os.scandir(path), key=lambda e: e.name, reverse=True)
+            except OSError:
+                entries = []
+            if any(entry.name in ZARR_MARKERS for entry in entries):
+                # zarr stores are never split
+                entries = []
+            for entry in entries:
+                try:
+                    # zarr stores with suffix are crawled like files
+                    if not entry.is_dir() or entry.name.endswith(".zarr"):
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if (stat.st_dev, stat.st_ino) not in visited_dirs:
+                    visited_dirs.add((stat.st_dev, stat.st_ino))
+                    sub_dirs.append(entry.name)
+            if not sub_dirs:
+                expanded.append((path, recursive))
+                continue
+            expanded.append((path, False))
+            expanded += [(os.path.join(path, d), True) for d in sub_dirs]
+        if len(expanded) == len(shards):
+            break
+        shards = expanded
+    return shards
+
+
+_worker_manifest: Optional[CrawlManifest] = None
+"""Read only crawl manifest of a crawl worker process."""
+_worker_queue: Optional[mp.queues.Queue] = None
+"""Queue the crawl worker processes send their results to."""
+
+ShardMessage = Tuple[
+    int,
+    List[Tuple[DRSFile, Dict[str, str]]],
+    List[FileSignature],
+    Optional[IngestStats],
+]
+"""Batch of results of a crawl shard: the index of the shard, the parsed
+files, the signatures of the crawled files and, with the last batch of
+the shard, the statistics of the shard."""
+
+
+def _init_crawl_worker(
+    structures: Dict[str, DRSStructure],
+    path_types: Dict[str, str],
+    manifest_file: Optional[Path] = None,
+    results: Optional[mp.queues.Queue] = None,
+) -> None:
+    """Make sure the worker processes use the DRS definitions of the parent."""
+    global _worker_manifest, _worker_queue
+    DRSFile.DRS_STRUCTURE = structures
+    DRSFile.DRS_STRUCTURE_PATH_TYPE = path_types
+    if manifest_file is not None:
+        _worker_manifest = CrawlManifest(manifest_file, readonly=True)
+    _worker_queue = results
+
+
+def _crawl_shard(
+    index: int,
+    shard: CrawlShard,
+    abort_on_errors: bool,
+    allowed_suffixes: Tuple[str, ...],
+    drs_type: Optional[str],
+    resume_after: Optional[str] = None,
+    batch_size: int = 1000,
+) -> None:
+    """Crawl and parse all files of one shard, executed by a worker process.
+
+    The results are sent to the parent process in batches of up to
+    ``batch_size`` crawled files, see :data:`ShardMessage`. Files that are
+    unchanged according to the crawl manifest are not parsed, the
+    signatures of all crawled files are sent so that the parent process
+    can update the manifest.
+
+    Symlink loops and duplicated links are only detected within one shard.
+    """
+    assert _worker_queue is not None
+    path, recursive = shard
+    results: List[Tuple[DRSFile, Dict[str, str]]] = []
+    signatures: List[FileSignature] = []
+    stats = IngestStats(progress_interval=None)
+    num_files = 0
+    for file, stat in stats.timed(
+        scan_dir(
+            path,
+            suffixes=allowed_suffixes,
+            recursive=recursive,
+            stats=stats.walk,
+            resume_after=resume_after,
+        ),
+        "walk",
+    ):
+        num_files += 1
+        if num_files % batch_size == 0:
+            _worker_queue.put((index, results, signatures, None))
+            results, signatures = [], []
+        if _worker_manifest is not None:
+            signature = file_signature(file, stat)
+            signatures.append(signature)
+            if _worker_manifest.is_unchanged(signature):
+                continue
+        result = SolrCore._get_metadata(
+            file, abort_on_errors, drs_type, stat=stat, stats=stats
+        )
+        if result is not None:
+            results.append(result)
+    _worker_queue.put((index, results, signatures, stats))
+
+
+class ShardCrawler:
+    """Crawl shards of a directory tree with a pool of processes.
+
+    The workers send their results in batches through a bounded queue, a
+    crawl that is faster than the ingestion is hence paused instead of
+    piling up results in memory. The results are yielded in the order of
+    the serial crawl, batches of shards that are crawled ahead of the
+    shard that is currently yielded are spooled to temporary files.
+
+    The pool is created when the crawler is entered. Enter it before
+    starting any threads, like those of :class:`IngestPipeline`, the
+    worker processes are forked.
+
+    Parameters
+    ----------
+    workers:
+        Number of worker processes.
+    manifest:
+        Crawl manifest of an incremental crawl.
+    batch_size:
+        Number of crawled files per batch sent by the workers.
+    max_pending:
+        Maximum number of shards that are crawled ahead, defaults to two
+        per worker.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        manifest: Optional[CrawlManifest] = None,
+        batch_size: int = 1000,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        self.workers = max(workers, 1)
+        self.manifest = manifest
+        self.batch_size = max(batch_size, 1)
+        self.max_pending = max(max_pending or 2 * self.workers, 1)
+        self._results: Optional[mp.queues.Queue] = None
+        self._pool: Optional[mp.pool.Pool] = None
+
+    def __enter__(self) -> ShardCrawler:
+        # Make sure the structures are loaded before handing them to the workers
+        DRSFile._get_structure_prefix_map()
+        self._results = mp.Queue(maxsize=2 * self.workers)
+        self._pool = mp.Pool(
+            self.workers,
+            initializer=_init_crawl_worker,
+            initargs=(
+                DRSFile.DRS_STRUCTURE,
+                DRSFile.DRS_STRUCTURE_PATH_TYPE,
+                getattr(self.manifest, "db_file", None),
+                self._results,
+            ),
+        )
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        if self._results is not None:
+            self._results.close()
+            self._results = None
+
+    def _next_message(self, pending: Dict[int, Any]) -> ShardMessage:
+        """Get the next batch of results, raise errors of the workers."""
+        assert self._results is not None
+        while True:
+            try:
+                return self._results.get(timeout=1)
+            except queue.Empty:
+                for result in pending.values():
+                    if result.ready() and not result.successful():
+                        result.get()
+
+    def _process(
+        self, message: ShardMessage, stats: Optional[IngestStats]
+    ) -> Iterator[Tuple[DRSFile, Dict[str, str]]]:
+        _, results, signatures, shard_stats = message
+        if stats is not None and shard_stats is not None:
+            stats.update(shard_stats)
+        if self.manifest is not None:
+            for signature in signatures:
+                self.manifest.record(signature)
+        yield from results
+
+    def crawl(
+        self,
+        shards: List[CrawlShard],
+        abort_on_errors: bool,
+        allowed_suffixes: Tuple[str, ...],
+        drs_type: Optional[str],
+        stats: Optional[IngestStats] = None,
+        resume_after: Optional[str] = None,
+    ) -> Iterator[Tuple[DRSFile, Dict[str, str]]]:
+        """Crawl shards, the results are yielded in order."""
+        if self._pool is None:
+            raise RuntimeError("The crawler has to be entered first")
+        crawl_func = partial(
+            _crawl_shard,
+            abort_on_errors=abort_on_errors,
+            allowed_suffixes=allowed_suffixes,
+            drs_type=drs_type,
+            resume_after=resume_after,
+            batch_size=self.batch_size,
+        )
+        pending: Dict[int, Any] = {}
+        spooled: Dict[int, IO[bytes]] = {}
+        submitted = current = 0
+        try:
+            while current < len(shards):
+                while (
+                    submitted < len(shards) and submitted - current < self.max_pending
+                ):
+                    pending[submitted] = self._pool.apply_async(
+                        crawl_func, (submitted, shards[submitted])
+                    )
+                    submitted += 1
+                if current in spooled:
+                    spool = spooled.pop(current)
+                    spool.seek(0)
+                    done = False
+                    with spool:
+                        while True:
+                            try:
+                                message = pickle.load(spool)
+                            except EOFError:
+                                break
+                            yield from self._process(message, stats)
+                            done = message[3] is not None
+                    if done:
+                        pending.pop(current, None)
+                        current += 1
+                    continue
+                message = self._next_message(pending)
+                index = message[0]
+                if index != current:
+                    if index not in spooled:
+                        spooled[index] = tempfile.TemporaryFile()
+                    pickle.dump(message, spooled[index])
+                    continue
+                yield from self._process(message, stats)
+                if message[3] is not None:
+                    pending.pop(current, None)
+                    current += 1
+        finally:
+            for spool in spooled.values():
+                spool.close()
+
+
+def _get_metadata_parallel(
+    in_dir: Path,
+    abort_on_errors: bool,
+    allowed_suffixes: Tuple[str, ...],
+    drs_type: Optional[str],
+    workers: int,
+    manifest: Optional[CrawlManifest] = None,
+    stats: Optional[IngestStats] = None,
+    shards_per_worker: int = 16,
+    resume_after: Optional[str] = None,
+    crawler: Optional[ShardCrawler] = None,
+) -> Iterator[Tuple[DRSFile, Dict[str, str]]]:
+    """Crawl a directory with a pool of processes.
+
+    The results are yielded in the order of the serial crawl. A crawler
+    is created if none is given.
+    """
+    shards = split_crawl_dir(in_dir, workers * shards_per_worker)
+    with ExitStack() as stack:
+        if crawler is None:
+            crawler = stack.enter_context(ShardCrawler(workers, manifest))
+        yield from crawler.crawl(
+            shards,
+            abort_on_errors,
+            allowed_suffixes,
+            drs_type,
+            stats=stats,
+            resume_after=resume_after,
+        )
@@ -376,3 +376,24 @@ def test_validate_path(root_path_with_empty_config, time_mock):
     assert user_data._validate_user_dirs(root_path_str) == (
         root_path_with_empty_config,
     )
+
+
+def test_validate_inventory(root_path_with_empty_config, time_mock):
+    import io
+
+    from evaluation_system.misc.exceptions import ValidationError
+    from evaluation_system.misc.utils import read_inventory
+    from freva import UserData
+
+    user_data = UserData()
+    valid = root_path_with_empty_config / "a.nc"
+    inventory = f"{valid}\n1024\t1700000000.5\t/other/b.nc\n1024\t1.5\t{valid}\n"
+    with pytest.raises(ValidationError):
+        user_data._validate_inventory(io.BytesIO(inventory.encode()))
+    with user_data._validate_inventory(
+        io.BytesIO(inventory.encode()), continue_on_errors=True
+    ) as validated:
+        entries = list(read_inventory(validated))
+    assert [path for path, _ in entries] == [valid, valid]
+    assert entries[0][1] is None
+    assert (entries[1][1].st_size, entries[1][1].st_mtime) == (1024, 1.5)
@@ -65,6 +65,92 @@ def test_structure_from_path(dummy_solr):
         dummy_solr.DRSFile.find_structure_from_path("/no/valid/file_path")
 
 
+def test_structure_prefix_map():
+    import pickle
+
+    from evaluation_system.model.file import StructurePrefixMap
+
+    prefixes = StructurePrefixMap({"/data/cmip5": "cmip5"})
+    prefixes["/data"] = "baseline0"
+    prefixes["/data/cmip5/output1"] = "cmip5_output"
+    fn = "/data/cmip5/output1/MOHC/tas_Amon.nc"
+    assert prefixes.match(fn) == ["cmip5_output"]
+    assert prefixes.match(fn, allow_multiples=True) == [
+        "cmip5_output",
+        "cmip5",
+        "baseline0",
+    ]
+    # prefixes only match whole path components
+    assert prefixes.match("/data/cmip56/tas.nc") == ["baseline0"]
+    assert prefixes.match("/data/cmip5/") == ["cmip5"]
+    assert prefixes.match("/other/data/cmip5") == []
+    del prefixes["/data/cmip5/output1"]
+    assert prefixes.match(fn) == ["cmip5"]
+    copy = pickle.loads(pickle.dumps(prefixes))
+    assert copy == prefixes
+    assert copy.match(fn, allow_multiples=True) == ["cmip5", "baseline0"]
+
+
+def test_compact_representation(dummy_solr):
+    import json
+    import pickle
+
+    from evaluation_system.model.file import DRSFile
+
+    drs = DRSFile.from_path(dummy_solr.fn)
+    other = DRSFile.from_path(os.path.join(dummy_solr.tmpdir, dummy_solr.files[1]))
+    assert not hasattr(drs, "__dict__")
+    assert drs.get_drs_structure() is DRSFile._get_drs_structure("cmip5")
+    # facet values are shared between files
+    assert drs.dict["parts"]["model"] is other.dict["parts"]["model"]
+    copy = pickle.loads(pickle.dumps(drs))
+    assert copy == drs
+    assert copy.to_json() == drs.to_json()
+    assert copy.to_dataset() == drs.to_dataset()
+    parts = dict(copy.dict["parts"], variable="tas")
+    copy.dict = {"root_dir": copy.dict["root_dir"], "parts": parts}
+    assert copy.dict["parts"]["variable"] == "tas"
+    assert copy.to_path().split(os.sep)[-2] == "tas"
+    assert copy.to_dataset().endswith(".tas")
+    # changes of the components are written to the file
+    path, root_dir = drs.to_path(), drs.dict["root_dir"]
+    drs.dict["parts"]["variable"] = "tas"
+    assert drs.dict["parts"]["variable"] == "tas"
+    assert drs.to_path().split(os.sep)[-2] == "tas"
+    assert drs.to_dataset().endswith(".tas")
+    drs.dict["parts"].update(variable=path.split(os.sep)[-2])
+    assert drs.to_path() == path
+    drs.dict["root_dir"] = "/other"
+    assert drs.to_path() == path.replace(root_dir, "/other", 1)
+    assert json.loads(drs.to_json())["root_dir"] == "/other"
+    drs.dict["parts"] = dict(other.dict["parts"])
+    assert drs.dict["parts"] == other.dict["parts"]
+    with pytest.raises(TypeError):
+        del drs.dict["parts"]
+
+
+def test_parse_many(dummy_solr):
+    from evaluation_system.model.file import DRSFile
+
+    paths = [os.path.join(dummy_solr.tmpdir, f) for f in dummy_solr.files]
+    invalid = [
+        "/no/valid/file_path.nc",
+        os.path.join(dummy_solr.tmpdir, "cmip5", "output1", "tas.nc"),
+    ]
+    table = DRSFile.parse_many(paths[:1] + invalid + paths[1:])
+    assert len(table) == len(paths)
+    assert table.columns["file"] == paths
+    assert sorted(table.errors) == sorted(invalid)
+    for num, path in enumerate(paths):
+        drs = DRSFile.from_path(path)
+        for key, value in drs.dict["parts"].items():
+            assert table.columns[key][num] == value
+        assert table.columns["dataset"][num] == "cmip5"
+    table = DRSFile.parse_many(paths, activity="reanalysis")
+    assert len(table) == 0
+    assert sorted(table.errors) == sorted(paths)
+
+
 def test_from_dict(dummy_solr):
     d = dummy_solr.drs.dict
     t = dummy_solr.DRSFile.from_dict(d, "cmip5")
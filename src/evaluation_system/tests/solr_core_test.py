@@ -86,3 +86,557 @@ def test_unload_and_create(dummy_solr):
     #    dummy_solr.all_files.create()
     dummy_solr.all_files.create(check_if_exist=False)
     assert len(dummy_solr.all_files.status()) >= 8
+
+
+def test_parallel_crawl(dummy_solr):
+    from evaluation_system.model.solr_core import (
+        ShardCrawler,
+        SolrCore,
+        dir_iter,
+        split_crawl_dir,
+    )
+
+    data_dir = Path(dummy_solr.tmpdir) / "cmip5"
+    shards = split_crawl_dir(data_dir, 4)
+    assert len(shards) >= 4
+    shard_files = [f for d, rec in shards for f in dir_iter(d, recursive=rec)]
+    assert shard_files == list(dir_iter(data_dir))
+    serial = [
+        m
+        for _, m in SolrCore._get_metadata_from_path(
+            data_dir, True, (".nc",), drs_type="cmip5"
+        )
+    ]
+    parallel = [
+        m
+        for _, m in SolrCore._get_metadata_from_path(
+            data_dir, True, (".nc",), drs_type="cmip5", workers=2
+        )
+    ]
+    assert len(serial) == len(shard_files)
+    assert serial == parallel
+    # Batches of single files of shards crawled ahead keep the order
+    for max_pending in (1, len(shards)):
+        with ShardCrawler(2, batch_size=1, max_pending=max_pending) as crawler:
+            batched = [m for _, m in crawler.crawl(shards, True, (".nc",), "cmip5")]
+        assert batched == serial
+
+
+def test_ingest_pipeline():
+    import threading
+    import time
+
+    from evaluation_system.model.solr_core import IngestPipeline
+
+    class SlowCore:
+        core = "files"
+
+        def __init__(self):
+            self.posted = []
+            self.lock = threading.Lock()
+
+        def post(self, docs):
+            time.sleep(0.01)
+            with self.lock:
+                self.posted.append(docs)
+
+    core = SlowCore()
+    with IngestPipeline(max_in_flight=3, queue_size=2) as pipeline:
+        for num in range(20):
+            assert pipeline.submit(core, [{"file": str(num)}]) == num + 1
+    assert sorted(int(d[0]["file"]) for d in core.posted) == list(range(20))
+    assert pipeline.completed == 20
+    assert pipeline.num_docs == {"files": 20}
+
+    class BadCore:
+        def post(self, docs):
+            raise ValueError("Bad request")
+
+    with pytest.raises(ValueError):
+        with IngestPipeline() as pipeline:
+            for num in range(10):
+                pipeline.submit(BadCore(), [{"file": str(num)}])
+
+
+def test_crawl_manifest(tmp_path):
+    from evaluation_system.model.crawl_manifest import CrawlManifest, file_signature
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    files = [data_dir / f"file_{num}.nc" for num in range(3)]
+    [f.touch() for f in files]
+    with CrawlManifest(tmp_path / "manifest.sqlite") as manifest:
+        manifest.start(data_dir)
+        assert manifest.has_entries(data_dir) is False
+        assert all(manifest.record(file_signature(f, f.stat())) for f in files)
+        manifest.commit()
+    files[0].unlink()
+    files[1].write_text("foo")
+    with CrawlManifest(tmp_path / "manifest.sqlite") as manifest:
+        manifest.start(data_dir)
+        assert manifest.has_entries(data_dir) is True
+        assert manifest.has_entries(tmp_path / "dat") is False
+        changed = [manifest.record(file_signature(f, f.stat())) for f in files[1:]]
+        assert changed == [True, False]
+        assert list(manifest.vanished(data_dir)) == [str(files[0])]
+        manifest.set_dataset(str(files[1]), "dataset", "v1")
+        manifest.set_dataset(str(files[2]), "dataset", "v2")
+        manifest.set_latest("dataset", "v2")
+        assert manifest.latest_version("dataset") == "v2"
+        assert manifest.older_files("dataset", "v2") == [str(files[1])]
+        assert manifest.remove([str(files[2])]) == {"dataset"}
+        assert manifest.newest_files("dataset") == ("v1", [str(files[1])])
+
+
+def test_incremental_ingest(dummy_solr, tmp_path):
+    import shutil
+
+    import mock
+
+    from evaluation_system.model.solr import SolrFindFiles
+    from evaluation_system.model.solr_core import SolrCore
+
+    data_dir = Path(dummy_solr.tmpdir) / "cmip5"
+    num_files = len(list(data_dir.rglob("*.nc")))
+    kwargs = dict(
+        abort_on_errors=True,
+        core_all_files=dummy_solr.all_files,
+        core_latest=dummy_solr.latest,
+        incremental=True,
+        manifest_file=tmp_path / "manifest.sqlite",
+    )
+    SolrCore.load_fs(data_dir, **kwargs)
+    assert dummy_solr.all_files.status()["index"]["numDocs"] == num_files
+    with mock.patch.object(SolrCore, "post") as post:
+        SolrCore.load_fs(data_dir, **kwargs)
+        post.assert_not_called()
+    assert dummy_solr.all_files.status()["index"]["numDocs"] == num_files
+    ff_latest = SolrFindFiles(
+        core="latest", host=dummy_solr.solr_host, port=dummy_solr.solr_port
+    )
+    latest_entries = set(ff_latest._search())
+    # touching a file of an old version doesn't add it to the latest core
+    dataset_dir = data_dir / "output1/MOHC/HadCM3/decadal2009/mon/atmos/Amon/r7i2p1"
+    versions = sorted(p.name for p in dataset_dir.iterdir())
+    file_name = "ua/ua_Amon_HadCM3_decadal2009_r7i2p1_200911-201912.nc"
+    (dataset_dir / versions[0] / file_name).write_text("  ")
+    SolrCore.load_fs(data_dir, **kwargs)
+    assert set(ff_latest._search()) == latest_entries
+    # a new version replaces the entries of the previous version
+    new_version = dataset_dir / "v20990101" / file_name
+    new_version.parent.mkdir(parents=True)
+    new_version.touch()
+    SolrCore.load_fs(data_dir, **kwargs)
+    previous = str(dataset_dir / versions[-1] / file_name)
+    assert previous in latest_entries
+    assert set(ff_latest._search()) == latest_entries - {previous} | {str(new_version)}
+    # the previous version is added again once the new version has vanished
+    shutil.rmtree(dataset_dir / "v20990101")
+    SolrCore.load_fs(data_dir, **kwargs)
+    assert set(ff_latest._search()) == latest_entries
+    assert dummy_solr.all_files.status()["index"]["numDocs"] == num_files
+
+
+def test_scan_dir(tmp_path):
+    from evaluation_system.model.solr_core import WalkStats, scan_dir
+
+    for version in ("v1", "v2"):
+        for var in ("pr", "tas"):
+            (tmp_path / "data" / version / var).mkdir(parents=True)
+            (tmp_path / "data" / version / var / f"{var}.nc").touch()
+            (tmp_path / "data" / version / var / f"{var}.txt").touch()
+    expected = []
+    for base_dir, dirs, files in os.walk(tmp_path / "data"):
+        dirs.sort(reverse=True)
+        expected += [Path(base_dir) / f for f in sorted(files, reverse=True)]
+    assert [f for f, _ in scan_dir(tmp_path / "data")] == expected
+    # symlink loops and duplicated links
+    (tmp_path / "data" / "v2" / "loop").symlink_to(tmp_path / "data")
+    (tmp_path / "data" / "v3").symlink_to(tmp_path / "data" / "v1")
+    (tmp_path / "data" / "v2" / "pr" / "pr_link.nc").symlink_to(
+        tmp_path / "data" / "v2" / "pr" / "pr.nc"
+    )
+    stats = WalkStats()
+    files = [f for f, _ in scan_dir(tmp_path / "data", suffixes=(".nc",), stats=stats)]
+    assert len(files) == 4
+    assert stats.files == 4
+    assert stats.duplicates == 3
+    assert stats.skipped_suffix == 4
+    assert stats.stat_calls_saved >= 4
+
+
+def test_crawl_zarr_stores(tmp_path):
+    from evaluation_system.api.user_data import DataReader
+    from evaluation_system.misc.utils import scan_dir
+    from evaluation_system.model.solr_core import split_crawl_dir
+
+    data_dir = tmp_path / "data"
+    for store in ("a/tas.zarr", "b/pr"):
+        for chunk in ("pr/.zarray", "pr/0.0.0", "pr/0.0.1", ".zgroup"):
+            (data_dir / store / chunk).parent.mkdir(exist_ok=True, parents=True)
+            (data_dir / store / chunk).touch()
+    (data_dir / "a" / "tas.nc").touch()
+    files = [f for f, _ in scan_dir(data_dir, suffixes=(".nc", ".zarr"))]
+    assert files == [
+        data_dir / "b" / "pr",
+        data_dir / "a" / "tas.zarr",
+        data_dir / "a" / "tas.nc",
+    ]
+    assert [f for f, _ in scan_dir(data_dir / "b" / "pr")] == [data_dir / "b" / "pr"]
+    shards = split_crawl_dir(data_dir, 100)
+    shard_files = [
+        f for d, rec in shards for f, _ in scan_dir(d, (".nc", ".zarr"), recursive=rec)
+    ]
+    assert shard_files == files
+    # symlinked directories are not followed by the reader
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "tas.nc").touch()
+    (data_dir / "c").symlink_to(tmp_path / "other")
+    assert sorted(DataReader(data_dir)) == sorted(files)
+
+
+def test_http_session():
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from evaluation_system.model.solr_core import SolrCore, get_http_session
+
+    requests_made = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            requests_made.append(self.client_address)
+            status = 503 if len(requests_made) == 1 else 200
+            body = gzip.compress(json.dumps({"responseHeader": {"status": 0}}).encode())
+            self.send_response(status)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        port = server.server_address[1]
+        core = SolrCore("files", host="127.0.0.1", port=port, get_status=False)
+        assert core.session is get_http_session("127.0.0.1", port)
+        assert core.get_json("select?q=*") == {"responseHeader": {"status": 0}}
+        assert len(requests_made) == 2
+        core.get_json("select?q=*")
+        # the connection is kept alive between requests
+        assert len(set(requests_made[1:])) == 1
+    finally:
+        server.shutdown()
+
+
+def test_commit_strategy(dummy_solr):
+    import mock
+
+    from evaluation_system.model.solr import SolrFindFiles
+    from evaluation_system.model.solr_core import SolrCore
+
+    data_dir = Path(dummy_solr.tmpdir) / "cmip5"
+    with pytest.raises(ValueError):
+        SolrCore.load_fs(data_dir, commit="foo")
+    with mock.patch.object(
+        SolrCore, "post", autospec=True, side_effect=SolrCore.post
+    ) as post:
+        SolrCore.load_fs(
+            data_dir,
+            abort_on_errors=True,
+            core_all_files=dummy_solr.all_files,
+            core_latest=dummy_solr.latest,
+            commit="within",
+            commit_within=100000,
+        )
+    assert all(c.kwargs.get("commit") is False for c in post.call_args_list)
+    assert [c.args[1] for c in post.call_args_list[-2:]] == [{"commit": {}}] * 2
+    ff_all = SolrFindFiles(
+        core="files", host=dummy_solr.solr_host, port=dummy_solr.solr_port
+    )
+    assert len(list(ff_all._search())) == len(list(data_dir.rglob("*.nc")))
+    # every chunk is committed by default
+    with mock.patch.object(
+        SolrCore, "post", autospec=True, side_effect=SolrCore.post
+    ) as post:
+        SolrCore.load_fs(
+            data_dir,
+            abort_on_errors=True,
+            core_all_files=dummy_solr.all_files,
+            core_latest=dummy_solr.latest,
+        )
+    chunks = [c for c in post.call_args_list if isinstance(c.args[1], list)]
+    assert chunks and all(c.kwargs.get("commit") is True for c in chunks)
+
+
+def test_iter_json_body():
+    import json
+
+    from evaluation_system.model.solr_core import iter_json_body
+
+    docs = [{"file": f"/data/file_{num}.nc", "variable": "tas"} for num in range(500)]
+    blocks = list(iter_json_body(iter(docs), buffer_size=1024))
+    assert len(blocks) > 1
+    assert all(len(block) < 2048 for block in blocks)
+    assert json.loads(b"".join(blocks)) == docs
+    assert json.loads(b"".join(iter_json_body([]))) == []
+    assert json.loads(b"".join(iter_json_body({"commit": {}}))) == {"commit": {}}
+    compressed = b"".join(iter_json_body(docs, compress=True))
+    assert json.loads(gzip.decompress(compressed)) == docs
+
+
+def test_latest_version_resolver():
+    from evaluation_system.model.latest_version import LatestVersionResolver
+
+    # datasets are revisited after they have been evicted from the cache
+    versions = [("a", "v1"), ("b", "v2"), ("a", "v3"), ("c", "v1"), ("b", "v1")]
+    versions += [("a", "v2"), ("a", "v3")]
+    with LatestVersionResolver(cache_size=1, batch_size=2) as resolver:
+        for num, (dataset, version) in enumerate(versions):
+            resolver.add(dataset, version, {"file": f"{dataset}/{version}/{num}.nc"})
+        assert sorted(resolver.versions()) == [("a", "v3"), ("b", "v2"), ("c", "v1")]
+        resolver.discard(["b"])
+        latest = sorted(d["file"] for d in resolver.latest())
+    assert latest == ["a/v3/2.nc", "a/v3/6.nc", "c/v1/3.nc"]
+
+
+def test_scan_dir_resume(tmp_path):
+    from evaluation_system.misc.utils import scan_dir
+    from evaluation_system.model.solr_core import split_crawl_dir
+
+    data_dir = tmp_path / "data"
+    for path in ("a/b/1.nc", "a/b/2.nc", "a/3.nc", "a/c/d/4.nc", "e/5.nc", "6.nc"):
+        (data_dir / path).parent.mkdir(exist_ok=True, parents=True)
+        (data_dir / path).touch()
+    (data_dir / "a" / "tas.zarr" / "tas").mkdir(parents=True)
+    (data_dir / "a" / "tas.zarr" / ".zgroup").touch()
+    files = [f for f, _ in scan_dir(data_dir)]
+    shards = split_crawl_dir(data_dir, 100)
+    for num, file in enumerate(files):
+        assert [f for f, _ in scan_dir(data_dir, resume_after=file)] == files[num + 1 :]
+        shard_files = [
+            f
+            for d, rec in shards
+            for f, _ in scan_dir(d, recursive=rec, resume_after=file)
+        ]
+        assert shard_files == files[num + 1 :]
+
+
+def test_resume_crawl(dummy_solr, tmp_path):
+    import mock
+
+    from evaluation_system.misc.utils import scan_dir
+    from evaluation_system.model.crawl_manifest import CrawlCheckpoint
+    from evaluation_system.model.solr import SolrFindFiles
+    from evaluation_system.model.solr_core import SolrCore
+
+    data_dir = Path(dummy_solr.tmpdir) / "cmip5"
+    kwargs = dict(
+        abort_on_errors=True,
+        core_all_files=dummy_solr.all_files,
+        core_latest=dummy_solr.latest,
+        checkpoint_dir=tmp_path,
+        chunk_size=1,
+    )
+    SolrCore.load_fs(data_dir, **kwargs)
+    assert not CrawlCheckpoint(data_dir, tmp_path).path.exists()
+    files = [str(f) for f, _ in scan_dir(data_dir, suffixes=(".nc",))]
+    # pretend a crawl got interrupted after the second file
+    CrawlCheckpoint(data_dir, tmp_path).save(files[1])
+    with mock.patch.object(
+        SolrCore, "post", autospec=True, side_effect=SolrCore.post
+    ) as post:
+        SolrCore.load_fs(data_dir, resume=True, **kwargs)
+    posted = [
+        doc["file"]
+        for c in post.call_args_list
+        if c.args[0] is dummy_solr.all_files and isinstance(c.args[1], list)
+        for doc in c.args[1]
+    ]
+    assert posted == files[2:]
+    assert not [c for c in post.call_args_list if "delete" in c.args[1]]
+    assert CrawlCheckpoint(data_dir, tmp_path).last_file is None
+    ff_all = SolrFindFiles(
+        core="files", host=dummy_solr.solr_host, port=dummy_solr.solr_port
+    )
+    assert sorted(ff_all._search()) == sorted(files)
+
+
+def test_load_inventory(dummy_solr, tmp_path):
+    from evaluation_system.misc.utils import scan_dir
+    from evaluation_system.model.solr import SolrFindFiles
+    from evaluation_system.model.solr_core import SolrCore
+
+    data_dir = Path(dummy_solr.tmpdir) / "cmip5"
+    files = [f for f, _ in scan_dir(data_dir, suffixes=(".nc",))]
+    inventory = tmp_path / "inventory.txt"
+    inventory.write_text(
+        "\n".join(f"{f.stat().st_size}\t{f.stat().st_mtime}\t{f}" for f in files[1:])
+        + f"\n{files[0]}\n{data_dir / 'not_data.txt'}\n"
+    )
+    [core.delete("*") for core in (dummy_solr.all_files, dummy_solr.latest)]
+    SolrCore.load_inventory(
+        inventory,
+        abort_on_errors=True,
+        core_all_files=dummy_solr.all_files,
+        core_latest=dummy_solr.latest,
+    )
+    ff_all = SolrFindFiles(
+        core="files", host=dummy_solr.solr_host, port=dummy_solr.solr_port
+    )
+    assert sorted(ff_all._search()) == sorted(map(str, files))
+
+
+def test_distributed_crawl(dummy_solr, tmp_path):
+    from evaluation_system.misc.utils import scan_dir
+    from evaluation_system.model.distributed_crawl import load_fs_distributed
+    from evaluation_system.model.solr import SolrFindFiles
+
+    data_dir = Path(dummy_solr.tmpdir) / "cmip5"
+    files = sorted(str(f) for f, _ in scan_dir(data_dir, suffixes=(".nc",)))
+    [core.delete("*") for core in (dummy_solr.all_files, dummy_solr.latest)]
+    stats = load_fs_distributed(
+        data_dir,
+        num_jobs=2,
+        abort_on_errors=True,
+        core_all_files=dummy_solr.all_files,
+        core_latest=dummy_solr.latest,
+        system="local",
+        work_dir=tmp_path,
+        poll_interval=0.5,
+        timeout=120,
+    )
+    assert stats["files"] == len(files)
+    assert not list(tmp_path.glob("crawl-*"))
+    ff_all = SolrFindFiles(
+        core="files", host=dummy_solr.solr_host, port=dummy_solr.solr_port
+    )
+    ff_latest = SolrFindFiles(
+        core="latest", host=dummy_solr.solr_host, port=dummy_solr.solr_port
+    )
+    assert sorted(ff_all._search()) == files
+    assert 0 < len(list(ff_latest._search())) <= len(files)
+
+
+def test_delete_files(dummy_solr):
+    import mock
+
+    from evaluation_system.misc.utils import scan_dir
+    from evaluation_system.model.solr import SolrFindFiles
+    from evaluation_system.model.solr_core import SolrCore
+
+    data_dir = Path(dummy_solr.tmpdir) / "cmip5"
+    files = sorted(str(f) for f, _ in scan_dir(data_dir, suffixes=(".nc",)))
+    SolrCore.load_fs(
+        data_dir,
+        abort_on_errors=True,
+        core_all_files=dummy_solr.all_files,
+        core_latest=dummy_solr.latest,
+    )
+    with mock.patch.object(
+        SolrCore, "post", autospec=True, side_effect=SolrCore.post
+    ) as post:
+        num = SolrCore.delete_files(
+            files[1:],
+            chunk_size=2,
+            core_all_files=dummy_solr.all_files,
+            core_latest=dummy_solr.latest,
+        )
+    assert num == len(files) - 1
+    deletes = [
+        c.args[1]["delete"] for c in post.call_args_list if "delete" in c.args[1]
+    ]
+    assert all(isinstance(ids, list) and len(ids) <= 2 for ids in deletes)
+    commits = [c for c in post.call_args_list if "commit" in c.args[1]]
+    assert len(commits) == 2
+    assert not [c for c in post.call_args_list if c.kwargs.get("commit")]
+    ff_all = SolrFindFiles(
+        core="files", host=dummy_solr.solr_host, port=dummy_solr.solr_port
+    )
+    assert list(ff_all._search()) == files[:1]
+
+
+def test_reindex_helpers(tmp_path):
+    from evaluation_system.model.reindex import _outermost_dirs, _set_update_log
+
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "ab").mkdir()
+    dirs = [tmp_path / "a" / "b", tmp_path / "ab", tmp_path / "a", tmp_path / "c"]
+    assert _outermost_dirs(dirs) == [tmp_path / "a", tmp_path / "ab"]
+    (tmp_path / "conf").mkdir()
+    solr_config = tmp_path / "conf" / "solrconfig.xml"
+    content = (
+        "<config><updateHandler>"
+        '<updateLog><str name="dir">${solr.ulog.dir:}</str></updateLog>'
+        "</updateHandler></config>"
+    )
+    solr_config.write_text(content)
+    _set_update_log(tmp_path, False, "solrconfig.xml")
+    assert "updateLog" not in solr_config.read_text()
+    _set_update_log(tmp_path, True, "solrconfig.xml")
+    assert solr_config.read_text() == content
+    assert not (tmp_path / "conf" / "solrconfig.xml.orig").exists()
+
+
+def test_ingest_stats():
+    import json
+    import pickle
+
+    from evaluation_system.model.ingest_stats import IngestStats
+    from evaluation_system.model.solr_core import iter_json_body
+
+    stats = IngestStats(expected_files=4, progress_interval=None)
+    assert list(stats.timed(range(3), "walk")) == [0, 1, 2]
+    stats.walk.files = 2
+    stats.add_post("files", 10, 0.02)
+    stats.add_post("latest", 5, 100.0)
+    body = b"".join(iter_json_body([{"file": "a"}, {"file": "b"}], stats=stats))
+    assert stats.bytes_posted == len(body)
+    other = pickle.loads(pickle.dumps(stats))
+    other.parse_failures = 1
+    stats.update(other)
+    summary = json.loads(json.dumps(stats.summary()))
+    assert summary["files"] == 4
+    assert summary["parse_failures"] == 1
+    assert summary["docs_posted"] == {"files": 20, "latest": 10}
+    assert summary["post_latency"]["0.05"] == 2
+    assert summary["post_latency"]["+Inf"] == 2
+    assert summary["posts"] == 4
+    assert "ETA" in stats.progress()
+
+
+def test_core_registry(dummy_solr, monkeypatch):
+    from evaluation_system.model.solr import SolrFindFiles
+    from evaluation_system.model.solr_core import SolrCore, get_solr_core
+
+    host, port = dummy_solr.solr_host, dummy_solr.solr_port
+    core = get_solr_core("files", host=host, port=port)
+    assert core is get_solr_core("files", host=host, port=port)
+    assert core is not get_solr_core("latest", host=host, port=port)
+    assert SolrFindFiles(core="files", host=host, port=port).solr is core
+    requests = []
+    get_json = SolrCore.get_json
+
+    def count_requests(self, endpoint, *args, **kwargs):
+        requests.append(endpoint)
+        return get_json(self, endpoint, *args, **kwargs)
+
+    monkeypatch.setattr(SolrCore, "get_json", count_requests)
+    dummy_solr.all_files.reload()
+    fields = core.get_solr_fields()
+    assert "variable" in fields
+    status = core.status(cached=True)
+    for _ in range(3):
+        assert core.get_solr_fields() == fields
+        assert SolrCore("files", host=host, port=port).instance_dir
+        assert core.status(cached=True) == status
+    assert len([r for r in requests if r.startswith("schema")]) == 1
+    assert len([r for r in requests if "action=STATUS" in r]) == 1
+    core.status()
+    assert len([r for r in requests if "action=STATUS" in r]) == 2
@@ -60,3 +60,110 @@ def test_facet_search(dummy_solr):
         "variable": ["tauu", 1, "ua", 3, "wetso2", 1],
         "project": ["cmip5", 5],
     }
+
+
+def test_search_paging(dummy_solr):
+    from evaluation_system.model.solr import SolrFindFiles
+
+    solr_search = SolrFindFiles(core="files")
+    all_files = list(solr_search._search())
+    assert len(all_files) == 5
+    assert list(solr_search._search(batch_size=2)) == all_files
+    assert list(solr_search._search(batch_size=2, start=1, rows=3)) == all_files[1:4]
+    assert list(solr_search._search(batch_size=2, start=4)) == all_files[4:]
+    assert list(solr_search._search(start=5)) == []
+    results = solr_search._search(batch_size=2)
+    assert len(results) == results.total == 5
+    assert list(results) == all_files
+    assert len(solr_search._search(batch_size=2, start=1, rows=3)) == 3
+    assert len(solr_search._search(variable="foo")) == 0
+    # documents with the same variable are ordered by their unique key
+    by_variable = list(solr_search._search(batch_size=1, sort="variable asc"))
+    assert sorted(by_variable) == sorted(all_files)
+    assert by_variable[1:4] == sorted(by_variable[1:4])
+
+
+def test_search_prefetch(dummy_solr):
+    import threading
+
+    from evaluation_system.model.solr import SolrFindFiles
+
+    solr_search = SolrFindFiles(core="files")
+    all_files = list(solr_search._search())
+    assert list(solr_search._search(batch_size=2, prefetch=2)) == all_files
+    assert list(solr_search._search(batch_size=1, prefetch=1, rows=3)) == all_files[:3]
+    results = solr_search._search(batch_size=1, prefetch=2)
+    assert next(results) == all_files[0]
+    results.close()
+    for thread in threading.enumerate():
+        if thread.name == "solr-prefetch":
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+
+
+def test_query_cache(tmp_path, monkeypatch):
+    from evaluation_system.model import query_cache
+    from evaluation_system.model.query_cache import QueryCache, query_key
+
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "time", lambda: now[0])
+    key = query_key("http://solr/files/", "count", "fq=a:1&fq=b:2&q=*:*")
+    assert key == query_key("http://solr/files/", "count", "q=*:*&fq=b:2&fq=a:1")
+    cache = QueryCache(ttl=10, maxsize=2)
+    assert cache.get_or_set(key, lambda: 1) == 1
+    assert cache.get_or_set(key, lambda: 2) == 1
+    now[0] += 10
+    assert cache.get_or_set(key, lambda: 3) == 3
+    # the least recently used entry is dropped
+    cache.set(query_key("http://solr/files/", "count", "q=a"), 4)
+    cache.set(query_key("http://solr/latest/", "count", "q=a"), 5)
+    assert cache.get(key) is None
+    # the on-disk tier is shared between caches and invalidated per core
+    first = QueryCache(ttl=10, cache_dir=tmp_path)
+    second = QueryCache(ttl=10, cache_dir=tmp_path)
+    latest_key = query_key("http://solr/latest/", "facets", "q=*:*", ("model",))
+    first.set(key, 6)
+    first.set(latest_key, {"model": ["a", 1]})
+    assert second.get(key) == 6
+    assert second.get(latest_key) == {"model": ["a", 1]}
+    second.invalidate("http://solr/files/")
+    assert first.get(key) == 6
+    assert QueryCache(ttl=10, cache_dir=tmp_path).get(key) is None
+    assert QueryCache(ttl=10, cache_dir=tmp_path).get(latest_key) is not None
+    assert QueryCache(ttl=0).get_or_set(key, lambda: 7) == 7
+
+
+def test_facet_cache(dummy_solr, monkeypatch):
+    from evaluation_system.model.query_cache import get_query_cache
+    from evaluation_system.model.solr import SolrFindFiles
+    from evaluation_system.model.solr_core import SolrCore
+
+    requests = []
+    get_json = SolrCore.get_json
+
+    def count_requests(self, endpoint, *args, **kwargs):
+        requests.append(endpoint)
+        return get_json(self, endpoint, *args, **kwargs)
+
+    monkeypatch.setattr(SolrCore, "get_json", count_requests)
+    get_query_cache().invalidate()
+    s = SolrFindFiles(core="files")
+    facets = s._facets(facets=["variable"], project="cmip5")
+    facets["variable"].clear()
+    assert s._facets(facets=["variable"], project="cmip5") == {
+        "variable": ["tauu", 1, "ua", 3, "wetso2", 1]
+    }
+    assert s._retrieve_metadata(variable="ua").num_objects == 3
+    assert s._retrieve_metadata(variable="ua").num_objects == 3
+    assert len(requests) == 2
+    # the order of the facets doesn't matter, they are returned as requested
+    both = s._facets(facets=["variable", "model"], project="cmip5")
+    assert list(both) == ["variable", "model"]
+    reverse = s._facets(facets=["model", "variable"], project="cmip5")
+    assert list(reverse) == ["model", "variable"]
+    assert reverse == both
+    assert len(requests) == 3
+    # committed changes invalidate the cached results
+    dummy_solr.all_files.delete("variable:ua")
+    assert s._retrieve_metadata(variable="ua").num_objects == 0
+    assert len(requests) == 4
@@ -35,3 +35,34 @@ def test_load_user_plugin(dummy_config) -> None:
     with freva.config(plugin_path=f"{DUMMY_PATH},dummy"):
         assert "dummyplugin" in freva.list_plugins()
     assert "dummyplugin" not in freva.list_plugins()
+
+
+def test_drs_config_cache(tmp_path, monkeypatch) -> None:
+    """Test caching the DRS config."""
+    import os
+    from unittest import mock
+
+    import toml
+
+    from evaluation_system.misc import config
+
+    drs_file = tmp_path / "drs_config.toml"
+    drs_file.write_text('[foo]\nroot_dir = "/foo"\n')
+    monkeypatch.setenv("EVALUATION_SYSTEM_DRS_CONFIG_FILE", str(drs_file))
+    with mock.patch.object(config.toml, "load", wraps=toml.load) as load:
+        drs_config = config.get_drs_config()
+        assert drs_config["foo"]["root_path"] == "/foo"
+        drs_config["foo"]["root_path"] = "/bar"
+        assert config.get_drs_config()["foo"]["root_path"] == "/foo"
+        assert load.call_count == 1
+        drs_file.write_text('[foo]\nroot_dir = "/foobar"\n')
+        assert config.get_drs_config()["foo"]["root_path"] == "/foobar"
+        assert load.call_count == 2
+        config.get_drs_config(reload=True)
+        assert load.call_count == 3
+        config.clear_drs_config_cache()
+        config.get_drs_config()
+        assert load.call_count == 4
+    os.remove(drs_file)
+    with pytest.raises(FileNotFoundError):
+        config.get_drs_config()
@@ -175,3 +175,24 @@ def test_mp_wrap_fn():
 
     res = mp_wrap_fn([test_f, 3, 2])
     assert res == 6
+
+
+def test_read_inventory(tmp_path):
+    import io
+    from pathlib import Path
+
+    from evaluation_system.misc.utils import read_inventory
+
+    inventory = tmp_path / "files.txt"
+    inventory.write_bytes(b"/data/a.nc\n1024\t1700000000.5\t/data/b c.nc\n\n/data/d.nc")
+    entries = list(read_inventory(inventory))
+    paths = ["/data/a.nc", "/data/b c.nc", "/data/d.nc"]
+    assert [p for p, _ in entries] == list(map(Path, paths))
+    assert entries[0][1] is None
+    assert entries[1][1].st_size == 1024
+    assert entries[1][1].st_mtime == 1700000000.5
+    stream = io.BytesIO(b"/data/a.nc\0/data/new\nline.nc\0")
+    assert [p for p, _ in read_inventory(stream)] == [
+        Path("/data/a.nc"),
+        Path("/data/new\nline.nc"),
+    ]
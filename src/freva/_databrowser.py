@@ -277,6 +277,7 @@ def databrowser(
     *,
     multiversion: bool = False,
     batch_size: int = 5000,
+    prefetch: int = 0,
     uniq_key: Literal["file", "uri"] = "file",
     time: str = "",
     time_select: Literal["flexible", "strict", "file"] = "flexible",
@@ -318,12 +319,17 @@ def databrowser(
         Select all versions and not just the latest version (default).
     batch_size: int, default: 5000
         Size of the search query.
+    prefetch: int, default: 0
+        Number of search result batches that are fetched in the background
+        while the current batch is processed. By default the next batch is
+        only fetched once the current batch has been consumed.
 
     Returns
     -------
     Iterator :
         If ``all_facets`` is False and ``facet`` is None an
-        iterator with results.
+        iterator with results. The total number of results is given
+        by ``len()`` of the iterator.
 
 
     Example
@@ -338,6 +344,7 @@ def databrowser(
                                   time_frequency='??min',
                                   variable='pr')
         print(files)
+        print(len(files))
         print(next(files))
         for file in files:
             print(file)
@@ -387,6 +394,7 @@ def databrowser(
         warnings.filterwarnings(action="ignore", category=PendingDeprecationWarning)
         search_results = SolrFindFiles(core=core)._search(
             batch_size=batch_size,
+            prefetch=prefetch,
             latest_version=not multiversion,
             uniq_key=uniq_key,
             **search_facets,
@@ -5,12 +5,14 @@ from __future__ import annotations
 import logging
 import os
 import shutil
+import tempfile
 import warnings
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Optional, Union
+from typing import IO, Any, Callable, Dict, Optional, Union
 
 import lazy_import
+from typing_extensions import Literal
 
 from evaluation_system.misc import logger
 from evaluation_system.misc.exceptions import ConfigurationException, ValidationError
@@ -18,10 +20,14 @@ from evaluation_system.misc.exceptions import ConfigurationException, Validation
 User = lazy_import.lazy_class("evaluation_system.model.user.User")
 config = lazy_import.lazy_module("evaluation_system.misc.config")
 SolrCore = lazy_import.lazy_class("evaluation_system.model.solr_core.SolrCore")
+IngestStats = lazy_import.lazy_class("evaluation_system.model.ingest_stats.IngestStats")
 DataReader = lazy_import.lazy_class("evaluation_system.api.user_data.DataReader")
 get_output_directory = lazy_import.lazy_function(
     "evaluation_system.api.user_data.get_output_directory"
 )
+read_inventory = lazy_import.lazy_function(
+    "evaluation_system.misc.utils.read_inventory"
+)
 from .utils import handled_exception
 
 __all__ = ["UserData"]
@@ -60,6 +66,46 @@ class UserData:
             user_paths += (crawl_dir,)
         return user_paths
 
+    def _validate_inventory(
+        self,
+        inventory: Union[os.PathLike, IO[bytes]],
+        continue_on_errors: bool = False,
+        **kwargs: bool,
+    ) -> IO[bytes]:
+        """Check that all files of an inventory belong to the user.
+
+        The inventory is validated completely before anything is indexed,
+        the valid records are written to a temporary NUL separated
+        inventory. Files of other users are skipped if
+        ``continue_on_errors`` is set.
+        """
+        root_path = self.user_dir
+        _allow_others = kwargs.get("_allow_others", False)
+        spool = tempfile.TemporaryFile()
+        try:
+            for path, stat in read_inventory(inventory):
+                path = path.expanduser().absolute()
+                try:
+                    _ = path.relative_to(root_path)
+                except ValueError:
+                    if not _allow_others:
+                        if not continue_on_errors:
+                            raise ValidationError(
+                                f"You are only allowed to crawl data in {root_path}"
+                            )
+                        logger.error("Skipping %s, not in %s", path, root_path)
+                        continue
+                record = os.fsencode(path)
+                if stat is not None:
+                    columns = f"{stat.st_size}\t{stat.st_mtime!r}\t"
+                    record = columns.encode() + record
+                spool.write(record + b"\0")
+            spool.seek(0)
+        except BaseException:
+            spool.close()
+            raise
+        return spool
+
     @staticmethod
     def _set_add_method(
         how: str,
@@ -237,13 +283,15 @@ class UserData:
             user_data.delete(user_data.user_dir)
 
         """
-        solr_core = SolrCore(core="files")
+        files = []
         for path in paths:
             for file in DataReader(Path(path).expanduser().absolute()):
                 self._validate_user_dirs(file)
-                solr_core.delete_entries(str(file))
-                if delete_from_fs:
-                    file.unlink()
+                files.append(file)
+        SolrCore.delete_files(files)
+        if delete_from_fs:
+            for file in files:
+                file.unlink()
 
     @handled_exception
     def index(
@@ -251,11 +299,15 @@ class UserData:
         *crawl_dirs: os.PathLike,
         dtype: str = "fs",
         continue_on_errors: bool = False,
+        commit: Literal["chunk", "within", "soft"] = "chunk",
+        inventory: Optional[Union[os.PathLike, IO[bytes]]] = None,
         **kwargs: bool,
-    ) -> None:
+    ) -> Dict[str, Any]:
         """Index and add user output data to the databrowser.
 
         This method can be used to update the databrowser for existing user data.
+        Instead of crawling directories the files can also be read from an
+        inventory, a precomputed list of files.
 
         Parameters
         ----------
@@ -265,11 +317,29 @@ class UserData:
             The data type, currently only files on the file system are supported.
         continue_on_errors:
             Continue indexing on error.
+        commit:
+            The commit strategy while indexing: ``chunk`` commits every chunk
+            of indexed files, ``within`` lets the databrowser commit the data
+            within a minute and ``soft`` makes every chunk visible without
+            flushing it to disk. All data is committed once indexing finished.
+        inventory:
+            Path to, or binary stream of, a file list holding one path per
+            line or NUL separated paths. Size and modification time can be
+            given as tab separated columns before the path, as created by
+            ``find <dir> -type f -printf '%s\t%T@\t%p\n'``.
+
+        Returns
+        -------
+        dict:
+            Summary of the indexing: the number of crawled, skipped and
+            unparsable files, the number of indexed documents and the time
+            spent crawling, parsing and sending the data.
 
         Raises
         ------
         ValidationError:
-            If crawl_dirs do not belong to current user.
+            If crawl_dirs or files of the inventory do not belong to current
+            user, the inventory is checked before anything is indexed.
 
         Example
         -------
@@ -290,15 +360,32 @@ class UserData:
         try:
             logger.setLevel(logging.ERROR)
             print("Status: crawling ...", end="", flush=True)
-            solr_core = SolrCore(core="latest")
-            for crawl_dir in self._validate_user_dirs(*crawl_dirs, **kwargs):
-                data_reader = DataReader(crawl_dir)
-                solr_core.load_fs(
-                    crawl_dir,
-                    chunk_size=1000,
-                    abort_on_errors=not continue_on_errors,
-                    drs_type=data_reader.drs_specification,
-                )
+            stats = IngestStats(progress_interval=None)
+            if inventory is not None:
+                with self._validate_inventory(
+                    inventory, continue_on_errors, **kwargs
+                ) as validated:
+                    SolrCore.load_inventory(
+                        validated,
+                        chunk_size=1000,
+                        abort_on_errors=not continue_on_errors,
+                        drs_type=DataReader.drs_specification,
+                        commit=commit,
+                        stats=stats,
+                        separator=b"\0",
+                    )
+            if inventory is None or crawl_dirs:
+                for crawl_dir in self._validate_user_dirs(*crawl_dirs, **kwargs):
+                    data_reader = DataReader(crawl_dir)
+                    SolrCore.load_fs(
+                        crawl_dir,
+                        chunk_size=1000,
+                        abort_on_errors=not continue_on_errors,
+                        drs_type=data_reader.drs_specification,
+                        commit=commit,
+                        stats=stats,
+                    )
             print("ok", flush=True)
         finally:
             logger.setLevel(log_level)
+        return stats.summary()
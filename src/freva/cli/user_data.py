@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import json
 import sys
 from pathlib import Path
 from typing import Any, Optional, Type
@@ -47,6 +48,27 @@ class IndexData(BaseParser):
             action="store_true",
             help="Continue indexing on error.",
         )
+        self.parser.add_argument(
+            "--inventory",
+            type=str,
+            default=None,
+            help=(
+                "Read the files to index from a file list instead of crawling "
+                "directories, use - to read from stdin. The list holds one path "
+                "per line or NUL separated paths, optionally preceded by tab "
+                "separated size and modification time columns."
+            ),
+        )
+        self.parser.add_argument(
+            "--commit",
+            default="chunk",
+            choices=["chunk", "within", "soft"],
+            help=(
+                "Commit strategy while indexing: commit every chunk, let the "
+                "server commit within a minute or soft commit every chunk. "
+                "All data is committed once indexing finished."
+            ),
+        )
         self.parser.add_argument(
             "--debug",
             "-v",
@@ -63,11 +85,16 @@ class IndexData(BaseParser):
         """Call the crawl my data command and print the results."""
         user_data = UserData()
         try:
-            user_data.index(
+            summary = user_data.index(
                 *args.crawl_dir,
                 dtype=args.data_type,
                 continue_on_errors=args.continue_on_errors,
+                commit=args.commit,
+                inventory=(
+                    sys.stdin.buffer if args.inventory == "-" else args.inventory
+                ),
             )
+            print(json.dumps(summary, indent=3))
         except (ValidationError, ValueError) as e:
             if args.debug:
                 raise e